@@ -0,0 +1,75 @@
+from settings import *
+from support import asset_pool
+from os.path import join, splitext
+from os import walk
+
+class AudioManager:
+    """
+    Gerencia o áudio do jogo.
+    Músicas longas (MUSIC_TRACKS) não são decodificadas na memória: tocam em streaming
+    pelo pygame.mixer.music, que lê o arquivo aos poucos. Só os efeitos curtos
+    (notice, fire, splash...) ficam carregados como Sound, prontos para tocar na hora.
+    """
+    def __init__(self, *path, music_tracks = MUSIC_TRACKS, fade_time = MUSIC_FADE_TIME):
+        self.music_paths = {} # nome -> caminho (lido só quando a música tocar)
+        sound_paths = {}
+        for folder_path, _, file_names in walk(join(*path)):
+            for file_name in file_names:
+                name = splitext(file_name)[0]
+                if name in music_tracks:
+                    self.music_paths[name] = join(folder_path, file_name)
+                else:
+                    sound_paths[name] = join(folder_path, file_name)
+
+        # Efeitos decodificados em paralelo (mesmo pool das imagens)
+        self.sounds = dict(zip(sound_paths, asset_pool.map(pygame.mixer.Sound, sound_paths.values())))
+
+        # Estado da troca de música: a atual abaixa o volume até zero, depois a próxima sobe.
+        # O mixer.music só toca um arquivo por vez, então a "transição" é feita em sequência.
+        self.fade_time = fade_time
+        self.current = None # Música tocando (ou saindo)
+        self.next = None # (nome, loops) da música que entra quando a atual terminar de sair
+        self.volume = 0 # Volume atual da música (0 a 1)
+        self.fade_direction = 0 # -1 saindo, 1 entrando, 0 parado
+
+    def __getitem__(self, name):
+        # Efeitos sonoros: audio['notice'].play()
+        return self.sounds[name]
+
+    def play_music(self, name, loops = -1):
+        """
+        Troca a música com transição. Se nada estiver tocando, a nova entra direto (com fade in).
+        """
+        if name == self.current and self.fade_direction >= 0:
+            return
+        self.next = (name, loops)
+        if pygame.mixer.music.get_busy():
+            self.fade_direction = -1
+        else:
+            self.start_next()
+
+    def stop_music(self):
+        self.next = None
+        self.fade_direction = -1
+
+    def start_next(self):
+        name, loops = self.next
+        self.next = None
+        pygame.mixer.music.load(self.music_paths[name])
+        pygame.mixer.music.set_volume(0)
+        pygame.mixer.music.play(loops)
+        self.current, self.volume, self.fade_direction = name, 0, 1
+
+    def update(self, dt):
+        if not self.fade_direction:
+            return
+        self.volume = max(0, min(1, self.volume + self.fade_direction * dt / self.fade_time))
+        pygame.mixer.music.set_volume(self.volume)
+
+        if self.fade_direction == 1 and self.volume == 1:
+            self.fade_direction = 0
+        elif self.fade_direction == -1 and self.volume == 0:
+            pygame.mixer.music.stop()
+            self.current, self.fade_direction = None, 0
+            if self.next:
+                self.start_next()
@@ -4,18 +4,21 @@ from groups import BattleSprites
 from game_data import ATTACK_DATA
 from support import draw_bar
 from tempo import Tempo
-from random import choice
+from battle_core import BattleCore
 
 class Battle:
-    def __init__(self, player_monsters, opponent_monsters, monster_frames, bg_surf, fonts, end_battle, character, sounds):
+    def __init__(self, player_monsters, opponent_monsters, monster_frames, monster_assets, bg_surf, fonts, end_battle, character, sounds):
         # Inicialização geral da superfície de exibição e assets gráficos/sonoros
         self.display_surface = pygame.display.get_surface()
         self.bg_surf = bg_surf
-        self.monster_frames = monster_frames
+        self.monster_frames = monster_frames # UI e ataques
+        self.monster_assets = monster_assets # Animações, ícones e contornos dos monstros (sob demanda)
         self.fonts = fonts
         
-        # Dicionário contendo os dados dos monstros do jogador e do oponente
-        self.monster_data = {'player': player_monsters, 'opponent': opponent_monsters}
+        # Regras e estado da batalha (iniciativa, dano, desmaios, trocas) ficam no núcleo;
+        # esta classe só desenha, lê o teclado e sincroniza os sprites com ele
+        self.core = BattleCore(player_monsters, opponent_monsters)
+        self.monster_data = self.core.monster_data
         
         # Flags e referências para controle do estado da batalha e do personagem
         self.battle_over = False
@@ -52,50 +55,68 @@ class Battle:
         self.setup()
 
     def setup(self):
-        # Itera sobre os dados dos monstros para criar os sprites iniciais
-        for entity, monster in self.monster_data.items():
-            # Cria apenas os 3 primeiros monstros de cada lado (índice <= 2)
-            for index, monster in {k:v for k,v in monster.items() if k <= 2}.items():
-                self.create_monster(monster, index, index, entity)
-
-            # Remove os monstros já criados da lista de dados do oponente para evitar duplicação
-            for i in range(len(self.opponent_sprites)):
-                del self.monster_data['opponent'][i]
+        # Prepara os gráficos de todos os monstros que podem entrar na luta, para que trocas
+        # e substituições no meio da batalha não carreguem nem espelhem nada.
+        # (Os monstros do oponente já em campo saíram da lista dele: estão só nos slots do núcleo)
+        self.graphics = {} # (espécie, espelhado) -> (quadros, contornos, silhuetas), presos no cache até o fim da batalha
+        for entity, monsters in self.monster_data.items():
+            for monster in list(monsters.values()) + self.core.get_active(entity):
+                self.get_graphics(monster.name.strip().lower(), entity == 'player')
+
+        # Cria os sprites dos monstros que o núcleo colocou em campo
+        for entity, slots in self.core.slots.items():
+            for pos_index, (index, monster) in slots.items():
+                self.create_monster(monster, index, pos_index, entity)
+
+    def get_graphics(self, monster_key, mirrored):
+        if (monster_key, mirrored) not in self.graphics:
+            self.graphics[(monster_key, mirrored)] = self.monster_assets.acquire(monster_key, mirrored)
+        return self.graphics[(monster_key, mirrored)]
+
+    def release_graphics(self):
+        # A batalha acabou: o orçamento do cache volta a valer para estas espécies
+        for monster_key, mirrored in self.graphics:
+            self.monster_assets.release(monster_key, mirrored)
+        self.graphics.clear()
+
+    def spawn_monster(self, monster, index, pos_index, entity):
+        # Substituto entrando em campo (depois da animação de morte de quem saiu)
+        self.core.spawn(monster, index, pos_index, entity)
+        self.create_monster(monster, index, pos_index, entity)
+
+    def get_targets(self, side):
+        # Sprites de um lado cujos monstros ainda estão em campo no núcleo
+        active = self.core.get_active(side)
+        sprite_group = self.opponent_sprites if side == 'opponent' else self.player_sprites
+        return [sprite for sprite in sprite_group if any(sprite.monster is monster for monster in active)]
+
+    def get_sprite(self, monster):
+        for monster_sprite in self.player_sprites.sprites() + self.opponent_sprites.sprites():
+            if monster_sprite.monster is monster:
+                return monster_sprite
 
     def create_monster(self, monster, index, pos_index, entity):
-        # Garante que o monstro não inicie pausado
-        monster.paused = False
-        
         # Normaliza o nome do monstro para buscar nos assets (minúsculo e sem espaços extras)
         monster_key = monster.name.strip().lower()
-        monster_data = self.monster_frames['monsters'][monster_key] 
         
-        # Define os frames de animação padrão
-        frames = monster_data 
-        
-        # Verifica se existem frames de contorno (outline), caso contrário usa os normais como fallback
-        if 'outlines' in monster_data:
-            outline_frames = monster_data['outlines']
-        else:
-            outline_frames = frames 
-            print(f"Aviso: Monstro '{monster_key}' não possui a chave 'outlines'. Usando frames normais.")
+        # Frames de animação, de contorno (outline) e silhuetas do flash branco de dano/seleção,
+        # carregados na primeira vez que a espécie aparece e presos no cache durante a batalha.
+        # Os do jogador vêm espelhados (olhando para a direita), do cache compartilhado por espécie.
+        mirrored = entity == 'player'
+        frames, outline_frames, silhouettes = self.get_graphics(monster_key, mirrored)
             
         # Configuração específica dependendo se é jogador ou oponente
         if entity == 'player':
             # Define posição à esquerda
             pos = list(BATTLE_POSITIONS['left'].values())[pos_index]
             groups = (self.battle_sprites, self.player_sprites)
-            
-            # Espelha as imagens horizontalmente para o monstro do jogador olhar para a direita
-            frames = {state: [pygame.transform.flip(frame, True, False) for frame in frames_list] for state, frames_list in frames.items()}
-            outline_frames = {state: [pygame.transform.flip(frame, True, False) for frame in frames_list] for state, frames_list in outline_frames.items()}
         else:
             # Define posição à direita
             pos = list(BATTLE_POSITIONS['right'].values())[pos_index]
             groups = (self.battle_sprites, self.opponent_sprites)
 
         # Criação do sprite principal do monstro
-        monster_sprite = MonsterSprite(pos, frames, groups, monster, index, pos_index, entity, self.apply_attack, self.create_monster)
+        monster_sprite = MonsterSprite(pos, frames, groups, monster, index, pos_index, entity, self.apply_attack, self.spawn_monster, silhouettes)
         
         # Criação do sprite de contorno (seleção)
         MonsterOutlineSprite(monster_sprite, self.battle_sprites, outline_frames)
@@ -112,12 +133,19 @@ class Battle:
         if self.selection_mode and self.current_monster:
             keys = pygame.key.get_just_pressed()
 
+            # Alvos possíveis: só quem ainda está em campo no núcleo (sem os sprites na
+            # animação de morte ou já capturados). Sem nenhum, volta ao menu geral.
+            targets = self.get_targets(self.selection_side)
+            if self.selection_mode == 'target' and not targets:
+                self.selection_mode = 'general'
+            self.indexes['target'] = min(self.indexes['target'], max(0, len(targets) - 1))
+
             # Define o limite de navegação baseado no menu atual
             match self.selection_mode:
                 case 'general': limiter = len(BATTLE_CHOICES['full'])
                 case 'attacks': limiter = len(self.current_monster.monster.get_abilities(all = False))
                 case 'switch': limiter = len(self.available_monsters)
-                case 'target': limiter = len(self.opponent_sprites) if self.selection_side == 'opponent' else len(self.player_sprites)
+                case 'target': limiter = len(targets)
 
             # Navegação para baixo e para cima nos menus (cíclico)
             if keys[pygame.K_DOWN]:
@@ -131,28 +159,27 @@ class Battle:
                 # Lógica para trocar de monstro
                 if self.selection_mode == 'switch':
                     index, new_monster = list(self.available_monsters.items())[self.indexes['switch']]
+                    self.core.switch(index) # Troca no núcleo e retoma a batalha
                     self.current_monster.kill() # Remove o monstro atual
                     self.create_monster(new_monster, index, self.current_monster.pos_index, 'player') # Cria o novo
                     self.selection_mode = None
-                    self.update_all_monsters('resume') # Retoma a batalha
 
                 # Lógica para selecionar um alvo
                 if self.selection_mode == 'target':
-                    sprite_group = self.opponent_sprites if self.selection_side == 'opponent' else self.player_sprites
-                    sprites = {sprite.pos_index: sprite for sprite in sprite_group}
+                    sprites = {sprite.pos_index: sprite for sprite in targets}
                     monster_sprite = sprites[list(sprites.keys())[self.indexes['target']]]
 
                     if self.selected_attack:
                         # Executa o ataque selecionado no alvo
                         self.current_monster.activate_attack(monster_sprite, self.selected_attack)
+                        self.core.begin_attack(self.selected_attack)
                         self.selected_attack, self.current_monster, self.selection_mode = None, None, None
                     else:
                         # Lógica de captura (se não houver ataque selecionado, assume tentativa de captura)
-                        if monster_sprite.monster.health < monster_sprite.monster.get_stat('max_health') * 0.9:
+                        if self.core.capture(monster_sprite.monster):
                             # Captura com sucesso se a vida estiver baixa
-                            self.monster_data['player'][len(self.monster_data['player'])] = monster_sprite.monster
                             monster_sprite.delayed_kill(None)
-                            self.update_all_monsters('resume')
+                            self.current_monster, self.selection_mode = None, None
                         else:
                             # Falha na captura
                             TimedSprite(monster_sprite.rect.center, self.monster_frames['ui']['cross'], self.battle_sprites, 1000)
@@ -169,8 +196,7 @@ class Battle:
                         self.selection_mode = 'attacks'
                     
                     if self.indexes['general'] == 1: # Defender
-                        self.current_monster.monster.defending = True
-                        self.update_all_monsters('resume')
+                        self.core.defend()
                         self.current_monster, self.selection_mode = None, None
                         self.indexes['general'] = 0
                     
@@ -195,106 +221,50 @@ class Battle:
             timer.update()
 
     # Sistema de batalha
-    def check_active(self):
-        # Verifica a iniciativa de todos os monstros
-        for monster_sprite in self.player_sprites.sprites() + self.opponent_sprites.sprites():
-            if monster_sprite.monster.initiative >= 100:
-                # É a vez deste monstro
-                monster_sprite.monster.defending = False
-                self.update_all_monsters('pause') # Pausa animações dos outros
-                monster_sprite.monster.initiative = 0
-                monster_sprite.set_highlight(True)
-                self.current_monster = monster_sprite
-                
-                # Se for do jogador, abre o menu; se for oponente, ativa IA
-                if self.player_sprites in monster_sprite.groups():
-                    self.selection_mode = 'general'
-                else:
-                    self.timers['opponent delay'].activate()
-
-    def update_all_monsters(self, option):
-        # Pausa ou resume todos os monstros em campo
-        for monster_sprite in self.player_sprites.sprites() + self.opponent_sprites.sprites():
-            monster_sprite.monster.paused = True if option == 'pause' else False
+    def start_turn(self, monster):
+        # É a vez deste monstro (o núcleo já pausou a batalha)
+        monster_sprite = self.get_sprite(monster)
+        monster_sprite.set_highlight(True)
+        self.current_monster = monster_sprite
+
+        # Se for do jogador, abre o menu; se for oponente, ativa IA
+        if monster_sprite.entity == 'player':
+            self.selection_mode = 'general'
+        else:
+            self.timers['opponent delay'].activate()
 
     def apply_attack(self, target_sprite, attack, amount):
         # Cria a animação do ataque e toca o som
         AttackSprite(target_sprite.rect.center, self.monster_frames['attacks'][ATTACK_DATA[attack]['animation']], self.battle_sprites)
         self.sounds[ATTACK_DATA[attack]['animation']].play()
 
-        # Obtém elementos para cálculo de dano
-        attack_element = ATTACK_DATA[attack]['element']
-        target_element = target_sprite.monster.element
-
-        # Multiplicadores de elemento (Dano Duplo)
-        # Fogo > Planta | Água > Fogo | Planta > Água
-        if attack_element == 'fire'  and target_element == 'plant' or \
-           attack_element == 'water' and target_element == 'fire'  or \
-           attack_element == 'plant' and target_element == 'water':
-            amount *= 2
-
-        # Multiplicadores de elemento (Dano pela Metade)
-        if attack_element == 'fire'  and target_element == 'water' or \
-           attack_element == 'water' and target_element == 'plant' or \
-           attack_element == 'plant' and target_element == 'fire':
-            amount *= 0.5
-
-        # Cálculo de defesa
-        target_defense = 1 - target_sprite.monster.get_stat('defense') / 2000
-        if target_sprite.monster.defending:
-            target_defense -= 0.2 # Bônus de defesa se estiver defendendo
-        target_defense = max(0, min(1, target_defense))
-
-        # Aplica o dano à vida do alvo
-        target_sprite.monster.health -= amount * target_defense
-        self.check_death()
-
-        # Retoma o fluxo da batalha
-        self.update_all_monsters('resume')
-
-    def check_death(self):
-        # Verifica se algum monstro morreu
-        for monster_sprite in self.opponent_sprites.sprites() + self.player_sprites.sprites():
-            if monster_sprite.monster.health <= 0:
-                if self.player_sprites in monster_sprite.groups(): # Lógica para monstro do jogador
-                    active_monsters = [(monster_sprite.index, monster_sprite.monster) for monster_sprite in self.player_sprites.sprites()]
-                    # Busca monstros disponíveis no banco
-                    available_monsters = [(index, monster) for index, monster in self.monster_data['player'].items() if monster.health > 0 and (index, monster) not in active_monsters]
-                    if available_monsters:
-                        # Prepara dados para substituição automática
-                        new_monster_data = [(monster, index, monster_sprite.pos_index, 'player') for index, monster in available_monsters][0]
-                    else:
-                        new_monster_data = None
-                else: # Lógica para monstro do oponente
-                    # Prepara o próximo monstro da lista do oponente
-                    new_monster_data = (list(self.monster_data['opponent'].values())[0], monster_sprite.index, monster_sprite.pos_index, 'opponent') if self.monster_data['opponent'] else None
-                    if self.monster_data['opponent']:
-                        del self.monster_data['opponent'][min(self.monster_data['opponent'])]
-                    
-                    # Cálculo de XP para os monstros do jogador
-                    xp_amount = monster_sprite.monster.level * 100 / len(self.player_sprites)
-                    for player_sprite in self.player_sprites:
-                        player_sprite.monster.update_xp(xp_amount)
-
-                # Inicia a sequência de morte (animação/remoção) e substituição
-                monster_sprite.delayed_kill(new_monster_data)
+        # Dano, desmaios e XP ficam no núcleo (que também retoma a batalha).
+        # Quem desmaiou sai de cena depois da animação de morte e o substituto entra em seguida
+        for monster, new_monster_data in self.core.apply_attack(target_sprite.monster, attack, amount):
+            self.get_sprite(monster).delayed_kill(new_monster_data)
 
     def opponent_attack(self):
         # IA simples do oponente: escolhe habilidade e alvo aleatórios
-        ability = choice(self.current_monster.monster.get_abilities())
-        random_target = choice(self.opponent_sprites.sprites()) if ATTACK_DATA[ability]['target'] == 'player' else choice(self.player_sprites.sprites())
-        self.current_monster.activate_attack(random_target, ability)
+        action = self.core.choose_action()
+        if not action:
+            # Sem alvo em campo: defende e passa a vez
+            self.core.defend()
+            self.current_monster = None
+            return
+        ability, target = action
+        self.current_monster.activate_attack(self.get_sprite(target), ability)
+        self.core.begin_attack(ability)
 
     def check_end_battle(self):
-        # Vitória: Todos os oponentes derrotados
-        if len(self.opponent_sprites) == 0 and not self.battle_over:
+        # O núcleo decide o vencedor; a tela só fecha depois que o último sprite saiu de cena
+        # Vitória: Todos os oponentes derrotados (ou capturados)
+        if self.core.winner == 'player' and len(self.opponent_sprites) == 0 and not self.battle_over:
             self.battle_over = True
+            self.release_graphics()
             self.end_battle(self.character)
-            for monster in self. monster_data['player'].values():
-                monster.initiative = 0 # Reseta iniciativa para o futuro
 
         # Derrota: Todos os monstros do jogador derrotados
-        if len(self.player_sprites) == 0:
+        if self.core.winner == 'opponent' and len(self.player_sprites) == 0:
             pygame.quit()
             exit()
 
@@ -374,15 +344,14 @@ class Battle:
         pygame.draw.rect(self.display_surface, COLORS['white'], bg_rect, 0, 5)
 
         # Filtra monstros disponíveis para troca (vivos e não ativos)
-        active_monsters = [(monster_sprite.index, monster_sprite.monster) for monster_sprite in self.player_sprites]
-        self.available_monsters = {index: monster for index, monster in self.monster_data['player'].items() if (index, monster) not in active_monsters and monster.health > 0}
+        self.available_monsters = self.core.get_available()
 
         for index, monster in enumerate(self.available_monsters.values()):
             selected = index == self.indexes['switch']
             item_bg_rect = pygame.FRect((0,0), (width, item_height)).move_to(midleft = (bg_rect.left, bg_rect.top + item_height / 2 + index * item_height + v_offset))
 
             # Desenha ícone e nome do monstro
-            icon_surf = self.monster_frames['icons'][monster.name]
+            icon_surf = self.monster_assets.icon(monster.name)
             icon_rect = icon_surf.get_frect(midleft = bg_rect.topleft + vector(10,item_height / 2 + index * item_height + v_offset))
             text_surf = self.fonts['regular'].render(f'{monster.name} ({monster.level})', False, COLORS['red'] if selected else COLORS['black'])
             text_rect = text_surf.get_frect(topleft = (bg_rect.left + 90, icon_rect.top))
@@ -414,10 +383,15 @@ class Battle:
         self.input()
         self.update_timers()
         self.battle_sprites.update(dt) # Atualiza animações dos sprites
-        self.check_active() # Gerencia turnos
+
+        # Avança a iniciativa no núcleo e gerencia turnos
+        monster = self.core.step(dt)
+        if monster:
+            self.start_turn(monster)
+        self.core.sync_initiative() # Barras de iniciativa
 
         # Renderização (Desenho)
         self.display_surface.blit(self.bg_surf, (0,0))
         # Desenha sprites passando informações de estado para destaques corretos
-        self.battle_sprites.draw(self.current_monster, self.selection_side, self.selection_mode, self.indexes['target'], self.player_sprites, self.opponent_sprites)
+        self.battle_sprites.draw(self.current_monster, self.selection_side, self.selection_mode, self.indexes['target'], self.get_targets('player'), self.get_targets('opponent'))
         self.draw_ui()
\ No newline at end of file
@@ -0,0 +1,299 @@
+from game_data import ATTACK_DATA
+from random import Random
+from heapq import heappush, heappop
+
+# ==============================================================================
+# NÚCLEO DA BATALHA (SEM PYGAME)
+# ==============================================================================
+# Estado e regras da batalha: iniciativa (ATB), dano, desmaios, XP, trocas e captura.
+# Não desenha nada nem lê teclado: a classe Battle (battle.py) é só a tela e o controle
+# em cima deste núcleo, e ferramentas/testes podem simular lutas inteiras sem janela.
+
+def get_element_multiplier(attack_element, target_element):
+    # Multiplicadores de elemento
+    # Fogo > Planta | Água > Fogo | Planta > Água (Dano Duplo)
+    if attack_element == 'fire'  and target_element == 'plant' or \
+       attack_element == 'water' and target_element == 'fire'  or \
+       attack_element == 'plant' and target_element == 'water':
+        return 2
+
+    # Caminho inverso (Dano pela Metade)
+    if attack_element == 'fire'  and target_element == 'water' or \
+       attack_element == 'water' and target_element == 'plant' or \
+       attack_element == 'plant' and target_element == 'fire':
+        return 0.5
+    return 1
+
+class BattleCore:
+    """
+    Estado de uma batalha.
+    Cada lado ('player' e 'opponent') tem até 3 posições em campo (slots):
+    posição na tela -> (índice na equipe, Monster).
+    """
+    def __init__(self, player_monsters, opponent_monsters, rng = None):
+        self.rng = rng if rng else Random()
+        self.monster_data = {'player': player_monsters, 'opponent': opponent_monsters}
+        self.slots = {'player': {}, 'opponent': {}}
+        self.pending = [] # Substitutos que vão entrar em campo (entity, posição), ainda não colocados
+        self.current = None # Monstro com o turno (esperando uma ação)
+        self.winner = None # 'player' ou 'opponent' quando a batalha acaba
+
+        # Agenda da iniciativa (ver TEMPO)
+        self.clock = 0 # Segundos de batalha
+        self.queue = [] # Heap de [instante em que a barra enche, lado, posição, ordem, monstro]
+        self.entries = {} # Monstro -> entrada dele na fila
+        self.order = 0 # Desempate final entre entradas (nunca compara monstros)
+        self.setup()
+
+    def setup(self):
+        # Coloca em campo os 3 primeiros monstros de cada lado (índice <= 2)
+        for entity, monsters in self.monster_data.items():
+            for index, monster in {k:v for k,v in monsters.items() if k <= 2}.items():
+                self.spawn(monster, index, index, entity)
+
+        # Remove os monstros já em campo da lista do oponente (o resto é a reserva dele)
+        for i in range(len(self.slots['opponent'])):
+            del self.monster_data['opponent'][i]
+
+    # --- CONSULTAS ---
+    def get_active(self, entity = None):
+        # Monstros em campo (de um lado ou dos dois, jogador primeiro)
+        entities = (entity,) if entity else ('player', 'opponent')
+        return [monster for entity in entities for index, monster in self.slots[entity].values()]
+
+    def get_side(self, monster):
+        for entity, slots in self.slots.items():
+            if any(active is monster for index, active in slots.values()):
+                return entity
+
+    def get_slot(self, monster):
+        for entity, slots in self.slots.items():
+            for pos_index, (index, active) in slots.items():
+                if active is monster:
+                    return entity, pos_index, index
+
+    def get_available(self):
+        """
+        Monstros do jogador que podem entrar em campo: vivos e fora de campo.
+        """
+        active = self.get_active('player')
+        return {index: monster for index, monster in self.monster_data['player'].items() if monster.health > 0 and all(monster is not other for other in active)}
+
+    # --- TEMPO (ATB) ---
+    # A iniciativa enche speed por segundo até 100. Em vez de somar a cada quadro e varrer
+    # o campo procurando quem chegou lá, cada monstro não pausado tem na fila (heap) o instante
+    # exato em que a barra dele enche. O próximo turno é sempre o topo da fila, e a entrada
+    # só é refeita quando o ritmo muda: pausa, retomada, entrada em campo ou mudança de nível.
+    def schedule(self, monster, entity, pos_index):
+        self.unschedule(monster)
+        if monster.paused:
+            return
+        ready = self.clock + max(0, 100 - monster.initiative) / monster.get_stat('speed')
+        # Mesmo instante: jogador primeiro e depois a posição em campo
+        entry = [ready, entity != 'player', pos_index, self.order, monster]
+        self.order += 1
+        self.entries[monster] = entry
+        heappush(self.queue, entry)
+
+    def unschedule(self, monster):
+        # Guarda a iniciativa acumulada até agora. A entrada fica na fila marcada como
+        # removida (sem monstro) e é descartada quando chegar ao topo
+        entry = self.entries.pop(monster, None)
+        if entry:
+            monster.initiative = self.get_initiative(entry)
+            entry[-1] = None
+
+    def get_initiative(self, entry):
+        ready, *_, monster = entry
+        return 100 - (ready - self.clock) * monster.get_stat('speed')
+
+    def sync_initiative(self):
+        # Atualiza a iniciativa de quem está na fila (só para a tela desenhar as barras)
+        for monster, entry in self.entries.items():
+            monster.initiative = self.get_initiative(entry)
+
+    def get_next(self):
+        # Entrada válida no topo da fila (ou None)
+        while self.queue and self.queue[0][-1] is None:
+            heappop(self.queue)
+        return self.queue[0] if self.queue else None
+
+    def pause_all(self, paused = True):
+        # Pausa ou resume a iniciativa de todos os monstros em campo
+        for entity, slots in self.slots.items():
+            for pos_index, (index, monster) in slots.items():
+                monster.paused = paused
+                self.schedule(monster, entity, pos_index)
+
+    def step(self, dt):
+        """
+        Avança o tempo da batalha em dt segundos.
+        Retorna o monstro que ganhou o turno agora (ou None).
+        """
+        self.clock += dt
+        return self.check_active()
+
+    def advance(self):
+        """
+        Pula direto para o próximo turno (simulações: sem esperar quadro a quadro).
+        """
+        entry = self.get_next()
+        return self.step(max(0, entry[0] - self.clock) if entry else 0)
+
+    def check_active(self):
+        # O primeiro monstro com a iniciativa cheia ganha o turno e a batalha pausa
+        if self.current or self.winner:
+            return None
+        entry = self.get_next()
+        if entry and entry[0] <= self.clock:
+            monster = entry[-1]
+            monster.defending = False
+            # A batalha pausa no instante exato em que a barra encheu (não no fim do quadro):
+            # a ordem dos turnos não depende da taxa de quadros
+            self.clock = entry[0]
+            self.pause_all()
+            monster.initiative = 0
+            self.current = monster
+            return monster
+
+    # --- AÇÕES DO TURNO ---
+    def choose_action(self):
+        """
+        IA simples (a do oponente): habilidade e alvo aleatórios.
+        Habilidades de alvo 'player' miram o próprio time; as de alvo 'opponent', o adversário.
+        Retorna (habilidade, alvo), ou None se não houver alvo (ex: o único monstro do outro
+        lado desmaiou e o substituto ainda não entrou); aí quem chamou decide (a IA defende).
+        """
+        own_side = self.get_side(self.current)
+        other_side = 'player' if own_side == 'opponent' else 'opponent'
+        ability = self.rng.choice(self.current.get_abilities())
+        targets = self.get_active(own_side if ATTACK_DATA[ability]['target'] == 'player' else other_side)
+        if not targets:
+            return None
+        return ability, self.rng.choice(targets)
+
+    def begin_attack(self, attack):
+        # O atacante gasta a energia na hora; o dano só entra em apply_attack
+        # (na tela, quando a animação do ataque termina). A batalha continua pausada até lá.
+        self.current.reduce_energy(attack)
+        self.current.stat_limiter()
+        self.current = None
+
+    def get_damage(self, target, attack, amount):
+        """
+        Dano final de um ataque: vantagem de elemento e defesa do alvo.
+        """
+        amount *= get_element_multiplier(ATTACK_DATA[attack]['element'], target.element)
+
+        # Cálculo de defesa
+        target_defense = 1 - target.get_stat('defense') / 2000
+        if target.defending:
+            target_defense -= 0.2 # Bônus de defesa se estiver defendendo
+        target_defense = max(0, min(1, target_defense))
+        return amount * target_defense
+
+    def apply_attack(self, target, attack, amount):
+        """
+        Aplica o dano no alvo e retoma a batalha.
+        Retorna os desmaios causados (ver check_death).
+        """
+        target.health -= self.get_damage(target, attack, amount)
+        target.stat_limiter()
+        faints = self.check_death()
+        self.pause_all(False)
+        return faints
+
+    def defend(self):
+        self.current.defending = True
+        self.current = None
+        self.pause_all(False)
+
+    def switch(self, index):
+        # Troca o monstro do turno por um da reserva, na mesma posição
+        entity, pos_index, _ = self.get_slot(self.current)
+        self.current = None
+        self.spawn(self.monster_data['player'][index], index, pos_index, 'player')
+        self.pause_all(False)
+
+    def capture(self, target):
+        """
+        Tenta capturar um monstro do oponente. Só funciona com a vida abaixo de 90%.
+        Se falhar, o turno continua (o jogador pode escolher outra ação).
+        Monstros que já saíram de campo (desmaiados ou capturados) não podem ser capturados.
+        """
+        slot = self.get_slot(target)
+        if slot is None or slot[0] != 'opponent' or target.health <= 0:
+            return False
+        if target.health >= target.get_stat('max_health') * 0.9:
+            return False
+        entity, pos_index, _ = slot
+        self.remove(entity, pos_index)
+        self.monster_data['player'][len(self.monster_data['player'])] = target
+        self.current = None
+        self.pause_all(False)
+        self.check_winner()
+        return True
+
+    # --- DESMAIOS E SUBSTITUIÇÕES ---
+    def spawn(self, monster, index, pos_index, entity):
+        # Coloca um monstro em campo (início, troca ou substituição de quem desmaiou)
+        if pos_index in self.slots[entity]:
+            self.remove(entity, pos_index) # Troca: quem sai perde o lugar na fila
+        monster.paused = False
+        self.slots[entity][pos_index] = (index, monster)
+        self.schedule(monster, entity, pos_index)
+        if (entity, pos_index) in self.pending:
+            self.pending.remove((entity, pos_index))
+
+    def remove(self, entity, pos_index):
+        index, monster = self.slots[entity].pop(pos_index)
+        self.unschedule(monster)
+
+    def check_death(self):
+        """
+        Tira de campo quem ficou sem vida e escolhe o substituto.
+        Retorna [(monstro, dados do substituto)], onde os dados são (monster, index, pos_index, entity)
+        ou None. O substituto só entra em campo com spawn() (na tela, depois da animação de morte).
+        """
+        faints = []
+        for entity in ('opponent', 'player'):
+            for pos_index, (index, monster) in list(self.slots[entity].items()):
+                if monster.health > 0:
+                    continue
+                self.remove(entity, pos_index)
+
+                if entity == 'player':
+                    # Primeiro monstro disponível da reserva
+                    available = list(self.get_available().items())
+                    new_monster_data = (available[0][1], available[0][0], pos_index, 'player') if available else None
+                else:
+                    # Próximo monstro da lista do oponente
+                    opponents = self.monster_data['opponent']
+                    new_monster_data = (opponents.pop(min(opponents)), index, pos_index, 'opponent') if opponents else None
+
+                    # XP dividido entre os monstros do jogador em campo
+                    if self.slots['player']:
+                        xp_amount = monster.level * 100 / len(self.slots['player'])
+                        for player_pos, (player_index, player_monster) in self.slots['player'].items():
+                            # A velocidade muda se subir de nível: a iniciativa acumulada é salva
+                            # com a velocidade antiga (que a ganhou) e a nova entrada usa a nova
+                            self.unschedule(player_monster)
+                            player_monster.update_xp(xp_amount)
+                            self.schedule(player_monster, 'player', player_pos)
+
+                if new_monster_data:
+                    self.pending.append((entity, pos_index))
+                if monster is self.current:
+                    self.current = None
+                faints.append((monster, new_monster_data))
+        self.check_winner()
+        return faints
+
+    def check_winner(self):
+        # Um lado perde quando não tem ninguém em campo nem substituto a caminho
+        for entity, other in (('opponent', 'player'), ('player', 'opponent')):
+            if not self.winner and not self.slots[entity] and not any(side == entity for side, _ in self.pending):
+                self.winner = other
+                if other == 'player':
+                    for monster in self.monster_data['player'].values():
+                        monster.initiative = 0 # Reseta iniciativa para o futuro
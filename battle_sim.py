@@ -0,0 +1,195 @@
+from game_data import MONSTER_DATA, ATTACK_DATA
+from battle_core import get_element_multiplier
+from time import perf_counter
+import numpy as np
+
+# ==============================================================================
+# SIMULADOR DE BATALHAS EM LOTE (NUMPY)
+# ==============================================================================
+# Ferramenta de balanceamento: roda N batalhas 1x1 independentes ao mesmo tempo.
+# Cada coluna de estado (vida, energia, iniciativa, atributos, elemento) é um array
+# com uma posição por batalha, e todas avançam juntas, um turno por iteração.
+#
+# As fórmulas são as mesmas do jogo (Monster e BattleCore):
+#   - atributo = base * nível; a iniciativa enche speed * dt até 100 (ATB)
+#   - dano base = attack * amount da habilidade (negativo = cura)
+#   - multiplicador de elemento (get_element_multiplier) e defesa 1 - defense / 2000 (-0.2 defendendo)
+#   - vida e energia presas entre 0 e o máximo (stat_limiter)
+# Como ninguém ganha iniciativa durante uma ação, em vez de andar quadro a quadro o
+# simulador pula direto para o próximo monstro com a barra cheia (empate: lado A primeiro,
+# como o jogador no jogo).
+#
+# Uso (na raiz do projeto): python battle_sim.py [número de batalhas]
+# Requer NumPy (só esta ferramenta; o jogo não depende dele).
+
+MAX_TURNS = 200 # Batalhas que passam disso contam como empate (ex: defesa anula todo o dano)
+BATCH_SIZE = 250_000 # Batalhas por lote (limita a memória dos arrays temporários)
+
+SPECIES = list(MONSTER_DATA)
+ATTACKS = list(ATTACK_DATA)
+ELEMENTS = sorted({data['stats']['element'] for data in MONSTER_DATA.values()} | {data['element'] for data in ATTACK_DATA.values()})
+
+def build_tables():
+    """
+    Tabelas indexadas por número (espécie, habilidade, elemento) no lugar dos dicionários.
+    """
+    stat_names = ('max_health', 'max_energy', 'attack', 'defense', 'speed')
+    tables = {
+        'stats': np.array([[MONSTER_DATA[name]['stats'][stat] for stat in stat_names] for name in SPECIES], dtype = np.float64),
+        'element': np.array([ELEMENTS.index(MONSTER_DATA[name]['stats']['element']) for name in SPECIES]),
+        'amount': np.array([ATTACK_DATA[attack]['amount'] for attack in ATTACKS], dtype = np.float64),
+        'cost': np.array([ATTACK_DATA[attack]['cost'] for attack in ATTACKS], dtype = np.float64),
+        'attack_element': np.array([ELEMENTS.index(ATTACK_DATA[attack]['element']) for attack in ATTACKS]),
+        'self_target': np.array([ATTACK_DATA[attack]['target'] == 'player' for attack in ATTACKS]),
+        'multiplier': np.array([[get_element_multiplier(a, t) for t in ELEMENTS] for a in ELEMENTS], dtype = np.float64),
+    }
+
+    # Nível em que cada espécie desbloqueia cada habilidade (infinito = nunca)
+    unlock = np.full((len(SPECIES), len(ATTACKS)), np.inf)
+    for species, name in enumerate(SPECIES):
+        for level, ability in MONSTER_DATA[name]['abilities'].items():
+            unlock[species, ATTACKS.index(ability)] = min(unlock[species, ATTACKS.index(ability)], level)
+    tables['unlock'] = unlock
+    return tables
+
+TABLES = build_tables()
+
+class Side:
+    """
+    Um lado de todas as batalhas do lote: arrays com uma posição por batalha.
+    """
+    def __init__(self, species, levels):
+        stats = TABLES['stats'][species] * levels[:, None]
+        self.max_health, self.max_energy, self.attack, self.defense, self.speed = stats.T
+        self.health = self.max_health.copy()
+        self.energy = self.max_energy.copy()
+        self.initiative = np.zeros(len(species))
+        self.defending = np.zeros(len(species), dtype = bool)
+        self.element = TABLES['element'][species]
+        self.unlocked = TABLES['unlock'][species] <= levels[:, None] # (batalha, habilidade)
+
+    def take(self, index):
+        # Mantém só as batalhas ainda em andamento
+        for name, value in vars(self).items():
+            setattr(self, name, value[index])
+
+def choose_abilities(unlocked, energy, affordable, rng):
+    """
+    Habilidade aleatória entre as disponíveis (como a IA do oponente).
+    affordable: Só as que a energia paga (como o menu do jogador, custo < energia).
+    Retorna o índice da habilidade ou -1 quando não há nenhuma (o monstro defende).
+    """
+    options = unlocked & (TABLES['cost'] < energy[:, None]) if affordable else unlocked
+    count = options.sum(axis = 1)
+    pick = (rng.random(len(count)) * count).astype(np.int64)
+    # A habilidade sorteada é a (pick + 1)-ésima opção verdadeira da linha
+    ability = np.argmax(np.cumsum(options, axis = 1) > pick[:, None], axis = 1)
+    return np.where(count > 0, ability, -1)
+
+def simulate_batch(species_a, levels_a, species_b, levels_b, rng, max_turns, affordable):
+    a, b = Side(species_a, levels_a), Side(species_b, levels_b)
+    size = len(species_a)
+    winner = np.zeros(size, dtype = np.int8) # 1: A venceu, -1: B venceu, 0: empate
+    turns = np.full(size, max_turns, dtype = np.int32)
+    alive = np.arange(size) # Índices (no lote) das batalhas em andamento
+
+    for turn in range(max_turns):
+        # Tempo até cada um encher a barra; quem chegar primeiro age
+        time_a = np.maximum(0, 100 - a.initiative) / a.speed
+        time_b = np.maximum(0, 100 - b.initiative) / b.speed
+        a_acts = time_a <= time_b
+        dt = np.where(a_acts, time_a, time_b)
+        a.initiative += a.speed * dt
+        b.initiative += b.speed * dt
+
+        # Atributo do atacante em cada batalha (escolhe elemento a elemento entre os dois lados)
+        def pick(name):
+            return np.where(a_acts, getattr(a, name), getattr(b, name))
+
+        a.initiative[a_acts], b.initiative[~a_acts] = 0, 0
+        a.defending[a_acts], b.defending[~a_acts] = False, False
+
+        ability = choose_abilities(np.where(a_acts[:, None], a.unlocked, b.unlocked), pick('energy'), affordable, rng)
+        acts = ability >= 0
+        safe_ability = np.maximum(ability, 0)
+
+        # Sem habilidade: defende
+        a.defending |= a_acts & ~acts
+        b.defending |= ~a_acts & ~acts
+
+        # Gasto de energia e dano (alvo: o próprio atacante nas habilidades de alvo 'player')
+        cost = np.where(acts, TABLES['cost'][safe_ability], 0)
+        self_target = TABLES['self_target'][safe_ability]
+        target_is_a = a_acts == self_target
+        amount = pick('attack') * TABLES['amount'][safe_ability]
+        target_element = np.where(target_is_a, a.element, b.element)
+        amount = amount * TABLES['multiplier'][TABLES['attack_element'][safe_ability], target_element]
+        defense = 1 - np.where(target_is_a, a.defense, b.defense) / 2000
+        defense -= 0.2 * np.where(target_is_a, a.defending, b.defending)
+        damage = np.where(acts, amount * np.clip(defense, 0, 1), 0)
+
+        a.energy -= np.where(a_acts, cost, 0)
+        b.energy -= np.where(a_acts, 0, cost)
+        a.health -= np.where(target_is_a, damage, 0)
+        b.health -= np.where(target_is_a, 0, damage)
+
+        # stat_limiter
+        for side in (a, b):
+            np.clip(side.health, 0, side.max_health, out = side.health)
+            np.clip(side.energy, 0, side.max_energy, out = side.energy)
+
+        # Fim das batalhas em que alguém desmaiou
+        a_dead, b_dead = a.health <= 0, b.health <= 0
+        over = a_dead | b_dead
+        if over.any():
+            winner[alive[over]] = np.where(b_dead[over], 1, -1)
+            turns[alive[over]] = turn + 1
+            keep = ~over
+            alive = alive[keep]
+            a.take(keep)
+            b.take(keep)
+            if not len(alive):
+                break
+    return winner, turns
+
+def simulate(species_a, levels_a, species_b, levels_b, rng = None, max_turns = MAX_TURNS, affordable = False):
+    """
+    Simula batalhas 1x1 entre species_a[i] (nível levels_a[i]) e species_b[i] (nível levels_b[i]).
+    As espécies podem ser nomes ou índices de SPECIES.
+    Retorna (winner, turns): winner 1 se A venceu, -1 se B venceu, 0 se empatou (max_turns);
+    turns é o número de ações até o fim.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    species_a, species_b = [np.array([SPECIES.index(s) if isinstance(s, str) else s for s in species]) for species in (species_a, species_b)]
+    levels_a, levels_b = np.asarray(levels_a, dtype = np.float64), np.asarray(levels_b, dtype = np.float64)
+
+    results = [simulate_batch(species_a[i:i + BATCH_SIZE], levels_a[i:i + BATCH_SIZE], species_b[i:i + BATCH_SIZE], levels_b[i:i + BATCH_SIZE], rng, max_turns, affordable)
+               for i in range(0, len(species_a), BATCH_SIZE)]
+    return np.concatenate([winner for winner, _ in results]), np.concatenate([turns for _, turns in results])
+
+def sweep(count, min_level = 5, max_level = 30, seed = None, affordable = False):
+    """
+    Confrontos aleatórios (espécie e nível sorteados) e um resumo por espécie do lado A:
+    {espécie: (batalhas, taxa de vitória, taxa de empate, média de turnos)}.
+    """
+    rng = np.random.default_rng(seed)
+    species_a, species_b = rng.integers(len(SPECIES), size = (2, count))
+    levels_a, levels_b = rng.integers(min_level, max_level + 1, size = (2, count))
+    winner, turns = simulate(species_a, levels_a, species_b, levels_b, rng, affordable = affordable)
+
+    summary = {}
+    for species, name in enumerate(SPECIES):
+        mask = species_a == species
+        if mask.any():
+            summary[name] = (int(mask.sum()), float((winner[mask] == 1).mean()), float((winner[mask] == 0).mean()), float(turns[mask].mean()))
+    return summary
+
+if __name__ == '__main__':
+    import sys
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = perf_counter()
+    summary = sweep(count)
+    print(f'{count} batalhas em {perf_counter() - start:.2f}s')
+    print(f'{"espécie":<14}{"batalhas":>10}{"vitórias":>10}{"empates":>10}{"turnos":>8}')
+    for name, (battles, wins, draws, mean_turns) in sorted(summary.items(), key = lambda item: -item[1][1]):
+        print(f'{name:<14}{battles:>10}{wins:>10.1%}{draws:>10.1%}{mean_turns:>8.1f}')
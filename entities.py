@@ -77,15 +77,16 @@ class Character(Entity):
     Classe para NPCs e Inimigos. Possui lógica de visão (Raycast),
     perseguição e inicialização de batalhas.
     """
-    def __init__(self, pos, frames, groups, facing_direction, character_data, player, create_dialog, collision_sprites, radius, nurse, notice_sound):
+    def __init__(self, pos, frames, groups, facing_direction, character_data, player, create_dialog, collision_sprites, occupancy, radius, nurse, notice_sound):
         super().__init__(pos, frames, groups, facing_direction)
         
         # Atributos específicos do NPC
         self.character_data = character_data # Dados do JSON (falas, tipo, monstros)
         self.player = player # Referência ao objeto do jogador para interações
         self.create_dialog = create_dialog # Função callback para criar balões de fala
-        # Lista de obstáculos para colisão (exclui o próprio NPC)
-        self.collision_rects = [sprite.rect for sprite in collision_sprites if sprite is not self]
+        # Mapa de ocupação compartilhado por todos os NPCs do mapa (usado na linha de visão)
+        self.occupancy = occupancy
+        self.collision_sprites = collision_sprites # Para avisar o hash espacial quando o NPC se move
         self.nurse = nurse # Booleano indicando se é uma enfermeira (cura)
         
         # Cria os monstros do NPC se existirem no dicionário de dados
@@ -137,10 +138,9 @@ class Character(Entity):
     def has_los(self):
         # Verifica "Line of Sight" (Linha de Visão) checando colisões com paredes
         if vector(self.rect.center).distance_to(self.player.rect.center) < self.radius:
-            # Cria uma linha imaginária entre NPC e Player e vê se ela cruza algum obstáculo
-            collisions = [bool(rect.clipline(self.rect.center, self.player.rect.center)) for rect in self.collision_rects]
-            # Retorna True apenas se NÃO houver colisões no caminho
-            return not any(collisions)
+            # Cria uma linha imaginária entre NPC e Player e percorre as células do mapa de ocupação
+            # que ela atravessa. Retorna True apenas se NÃO houver obstáculos no caminho
+            return self.occupancy.line_of_sight(self.rect.center, self.player.rect.center)
 
     def start_move(self):
         # Calcula vetor normalizado apontando para o jogador para iniciar perseguição
@@ -154,6 +154,7 @@ class Character(Entity):
             if not self.hitbox.inflate(10,10).colliderect(self.player.hitbox):
                 self.rect.center += self.direction * self.speed * dt
                 self.hitbox.center = self.rect.center
+                self.collision_sprites.relocate(self)
             else:
                 # Se encostou: para, marca como movido, inicia diálogo e libera o estado de "notado" do player
                 self.direction = vector()
@@ -183,6 +184,19 @@ class Player(Entity):
         self.collision_sprites = collision_sprites # Grupo de sprites que são obstáculos (árvores, paredes)
         self.noticed = False # Estado visual para quando um NPC te vê (exclamação na cabeça)
 
+    def place(self, pos, facing_direction, collision_sprites):
+        """
+        Coloca o jogador em um ponto de spawn ao entrar em um mapa.
+        O mesmo Player é reaproveitado entre mapas (os NPCs guardam referência a ele).
+        """
+        self.rect.center = pos
+        self.hitbox.center = self.rect.center
+        self.y_sort = self.rect.centery
+        self.facing_direction = facing_direction
+        self.collision_sprites = collision_sprites
+        self.noticed = False
+        self.unblock()
+
     def input(self):
         # Captura o estado de todas as teclas
         keys = pygame.key.get_pressed()
@@ -213,8 +227,8 @@ class Player(Entity):
         self.collisions('vertical') # Checa e resolve colisão vertical
 
     def collisions(self, axis):
-        # Verifica colisão contra todos os obstáculos
-        for sprite in self.collision_sprites:
+        # Verifica colisão apenas contra os obstáculos das células vizinhas (hash espacial)
+        for sprite in self.collision_sprites.near(self.hitbox):
             if sprite.hitbox.colliderect(self.hitbox):
                 if axis == 'horizontal':
                     # Se estava indo para a direita e bateu, encosta o lado direito da hitbox no lado esquerdo do obstáculo
@@ -6,14 +6,14 @@ class Evolution:
     Gerencia a sequência de animação de evolução.
     Controla a transição visual, efeitos de luz, texto e a troca de sprites.
     """
-    def __init__(self, frames, start_monster, end_monster, font, end_evolution, star_frames):
+    def __init__(self, monster_assets, start_monster, end_monster, font, end_evolution, star_frames):
         # Obtém a referência da tela principal do jogo para desenhar
         self.display_surface = pygame.display.get_surface()
         
         # Carrega e dobra o tamanho (scale2x) da imagem do monstro atual e da sua evolução
         # Usa o frame 0 da animação 'idle' (parado) como referência
-        self.start_monster_surf = pygame.transform.scale2x(frames[start_monster]['idle'][0])
-        self.end_monster_surf = pygame.transform.scale2x(frames[end_monster]['idle'][0])
+        self.start_monster_surf = pygame.transform.scale2x(monster_assets.frames(start_monster)['idle'][0])
+        self.end_monster_surf = pygame.transform.scale2x(monster_assets.frames(end_monster)['idle'][0])
         
         # Define os temporizadores da cena:
         # 'start': Um atraso inicial de 800ms antes da animação começar.
@@ -33,11 +33,11 @@ class Evolution:
         self.tint_surf.set_alpha(200) # 0 é transparente, 255 é sólido. 200 é bem escuro.
 
         # Configuração do efeito de "Flash Branco" (whitening)
-        # 1. Cria uma máscara (mask) da silhueta do monstro.
-        # 2. Converte essa máscara de volta para uma superfície (imagem sólida).
-        self.start_monster_surf_white = pygame.mask.from_surface(self.start_monster_surf).to_surface()
-        # 3. Define que a cor de fundo da máscara será transparente (remove o retângulo preto padrão).
-        self.start_monster_surf_white.set_colorkey('black')
+        # Usa a silhueta branca já pronta do quadro (a mesma do flash da batalha), ampliada
+        # como o monstro. O fundo preto dela já é transparente (colorkey).
+        start_frames = monster_assets.frames(start_monster)
+        start_frame = start_frames['idle'][0]
+        self.start_monster_surf_white = pygame.transform.scale2x(monster_assets.silhouettes(start_monster, frames = start_frames)[start_frame])
         
         # Variáveis para controlar a intensidade do branco
         self.tint_amount, self.tint_speed = 0, 80 # Começa transparente (0) e aumenta 80 por segundo
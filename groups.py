@@ -1,6 +1,64 @@
 from settings import * 
 from support import import_image
 from entities import Entity
+from spatial import SpatialGrid, YSortIndex
+from itertools import count
+from collections import OrderedDict
+
+class TerrainChunks:
+    """
+    Chão estático (camadas 'Terrain' e 'Terrain Top') pré-renderizado em blocos grandes.
+    Em vez de milhares de sprites de 64px, o desenho faz poucos blits de superfícies
+    grandes, e só dos blocos que aparecem na câmera.
+    """
+    def __init__(self, chunk_size = TERRAIN_CHUNK_SIZE, cache_size = TERRAIN_CHUNK_CACHE):
+        self.chunk_pixels = chunk_size * TILE_SIZE # Tamanho do bloco em pixels
+        self.cache_size = cache_size
+        self.tiles = {} # (coluna, linha) do bloco -> lista de (superfície, posição relativa)
+        self.surfaces = OrderedDict() # Blocos já renderizados, do menos para o mais usado (LRU)
+
+    def add_tile(self, pos, surf):
+        """
+        Registra um tile no(s) bloco(s) que ele cobre.
+        Um tile maior que a grade pode cruzar a borda, então entra em todos os blocos que toca.
+        """
+        rect = surf.get_frect(topleft = pos)
+        for col in range(int(rect.left // self.chunk_pixels), int((rect.right - 1) // self.chunk_pixels) + 1):
+            for row in range(int(rect.top // self.chunk_pixels), int((rect.bottom - 1) // self.chunk_pixels) + 1):
+                local_pos = (rect.left - col * self.chunk_pixels, rect.top - row * self.chunk_pixels)
+                self.tiles.setdefault((col, row), []).append((surf, local_pos))
+
+    def get_surface(self, chunk):
+        """
+        Retorna a superfície do bloco, renderizando na primeira vez que ele aparece.
+        Mantém no máximo 'cache_size' blocos na memória (descarta o usado há mais tempo).
+        """
+        if chunk in self.surfaces:
+            self.surfaces.move_to_end(chunk)
+            return self.surfaces[chunk]
+
+        surf = pygame.Surface((self.chunk_pixels, self.chunk_pixels), pygame.SRCALPHA)
+        # Os tiles são desenhados na ordem em que vieram do mapa ('Terrain Top' por cima de 'Terrain')
+        surf.fblits(self.tiles[chunk])
+        self.surfaces[chunk] = surf
+        if len(self.surfaces) > self.cache_size:
+            self.surfaces.popitem(last = False)
+        return surf
+
+    def draw(self, surface, camera_rect, offset):
+        left = int(camera_rect.left // self.chunk_pixels)
+        right = int((camera_rect.right - 1) // self.chunk_pixels)
+        top = int(camera_rect.top // self.chunk_pixels)
+        bottom = int((camera_rect.bottom - 1) // self.chunk_pixels)
+        for col in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                if (col, row) in self.tiles:
+                    pos = (col * self.chunk_pixels + offset.x, row * self.chunk_pixels + offset.y)
+                    surface.blit(self.get_surface((col, row)), pos)
+
+    def clear(self):
+        self.tiles.clear()
+        self.surfaces.clear()
 
 class AllSprites(pygame.sprite.Group):
     """
@@ -16,6 +74,73 @@ class AllSprites(pygame.sprite.Group):
         self.shadow_surf = import_image('graphics', 'other', 'shadow')
         self.notice_surf = import_image('graphics', 'ui', 'notice')
 
+        # --- ÍNDICE ESPACIAL (CULLING) ---
+        # Sprites de fundo e de topo ficam numa grade por tile; o desenho consulta só as
+        # células que a câmera cobre, então o custo depende da tela e não do mapa.
+        self.grid = SpatialGrid()
+        # A camada principal fica numa lista que já está ordenada por y_sort
+        # (inclui as entidades, que são reposicionadas quando se movem)
+        self.main_layer = YSortIndex()
+        self.pending_sprites = [] # Sprites recém-adicionados (ainda sem rect quando o grupo os recebe)
+        self.draw_order = {} # sprite -> ordem de inserção (mantém a ordem original dentro de cada camada)
+        self.order_counter = count()
+
+        # Só sprites que realmente têm lógica por quadro (entidades, animados, timers).
+        # Tiles estáticos (Sprite, BorderSprite, CollidableSprite...) nunca entram aqui.
+        # Dicionário em vez de set para manter a ordem de atualização original.
+        self.tickable_sprites = {}
+
+        # Chão estático pré-renderizado (desenhado antes de qualquer sprite)
+        self.terrain = TerrainChunks()
+
+    def empty(self):
+        super().empty()
+        self.terrain.clear()
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.draw_order[sprite] = next(self.order_counter)
+        if type(sprite).update is not pygame.sprite.Sprite.update:
+            self.tickable_sprites[sprite] = None
+        # O Sprite se adiciona aos grupos ANTES de definir image/rect,
+        # então a indexação é adiada até o próximo desenho.
+        self.pending_sprites.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.draw_order[sprite]
+        self.tickable_sprites.pop(sprite, None)
+        if sprite in self.main_layer:
+            self.main_layer.remove(sprite)
+        elif sprite in self.grid:
+            self.grid.remove(sprite)
+        else:
+            self.pending_sprites.remove(sprite)
+
+    def restore_order(self, sprite, order):
+        # Sprite construído depois (streaming) volta para a posição que teria na ordem do mapa
+        self.draw_order[sprite] = order
+
+    def update(self, *args, **kwargs):
+        """
+        Atualiza apenas os sprites "tickáveis", em vez de despachar update()
+        para milhares de tiles que não fazem nada.
+        """
+        # Cópia da lista: um update pode remover sprites do grupo (ex: kill)
+        for sprite in list(self.tickable_sprites):
+            sprite.update(*args, **kwargs)
+
+    def index_pending(self):
+        """
+        Coloca os sprites adicionados desde o último quadro no índice correto.
+        """
+        for sprite in self.pending_sprites:
+            if sprite.z == WORLD_LAYERS['main']:
+                self.main_layer.insert(sprite, self.draw_order[sprite], dynamic = isinstance(sprite, Entity))
+            else:
+                self.grid.insert(sprite, sprite.rect)
+        self.pending_sprites.clear()
+
     def draw(self, player):
         """
         Desenha todos os sprites levando em conta a posição do jogador.
@@ -28,22 +153,33 @@ class AllSprites(pygame.sprite.Group):
         self.offset.x = -(player.rect.centerx - WINDOW_WIDTH / 2)
         self.offset.y = -(player.rect.centery - WINDOW_HEIGHT / 2)
 
+        # --- CULLING ---
+        # Só entra na lista de desenho quem está dentro da área visível da câmera
+        self.index_pending()
+        self.main_layer.reposition()
+        camera_rect = pygame.FRect(-self.offset, (WINDOW_WIDTH, WINDOW_HEIGHT))
+        visible_sprites = self.grid.query(camera_rect)
+
         # --- SEPARAÇÃO POR CAMADAS (LAYERS) ---
-        # Filtra os sprites em 3 listas baseadas no Z-Index definido em settings.py
+        # Filtra os sprites visíveis em 3 listas baseadas no Z-Index definido em settings.py.
+        # A ordem de inserção (draw_order) reproduz a ordem em que o grupo era percorrido.
         
         # 1. Background (Chão): Desenhado primeiro (fica atrás de tudo)
-        bg_sprites = [sprite for sprite in self if sprite.z < WORLD_LAYERS['main']]
+        bg_sprites = sorted([sprite for sprite in visible_sprites if sprite.z < WORLD_LAYERS['main']], key = self.draw_order.get)
         
         # 2. Main (Personagens/Objetos): Desenhado no meio.
         # IMPORTANTE: Ordenado pelo 'y_sort' (base do sprite). 
         # Quem tem o Y maior (está mais embaixo na tela) é desenhado por último, ficando "na frente".
-        # Isso cria o efeito de profundidade 2.5D.
-        main_sprites = sorted([sprite for sprite in self if sprite.z == WORLD_LAYERS['main']], key = lambda sprite: sprite.y_sort)
+        # Isso cria o efeito de profundidade 2.5D. O YSortIndex já devolve nessa ordem.
+        main_sprites = self.main_layer.query(camera_rect)
         
         # 3. Foreground (Topo de árvores): Desenhado por último (fica na frente de tudo)
-        fg_sprites = [sprite for sprite in self if sprite.z > WORLD_LAYERS['main']]
+        fg_sprites = sorted([sprite for sprite in visible_sprites if sprite.z > WORLD_LAYERS['main']], key = self.draw_order.get)
 
         # --- LOOP DE DESENHO ---
+        # O terreno foi o primeiro a ser criado no mapa, então continua sendo desenhado primeiro
+        self.terrain.draw(self.display_surface, camera_rect, self.offset)
+
         for layer in (bg_sprites, main_sprites, fg_sprites):
             for sprite in layer:
                 # Se for uma entidade (Player/NPC), desenha a sombra antes do corpo
@@ -60,6 +196,151 @@ class AllSprites(pygame.sprite.Group):
                     rect = self.notice_surf.get_frect(midbottom = sprite.rect.midtop)
                     self.display_surface.blit(self.notice_surf, rect.topleft + self.offset)
 
+class CollisionSprites(pygame.sprite.Group):
+    """
+    Grupo dos obstáculos do mapa (objetos, paredes invisíveis e NPCs).
+    Mantém um hash espacial das hitboxes para que a colisão do jogador teste
+    só quem está nas células vizinhas, e não o mapa inteiro.
+    """
+    def __init__(self):
+        super().__init__()
+        self.grid = SpatialGrid()
+        self.pending_sprites = [] # Sprites ainda sem hitbox quando entraram no grupo
+        self.order = {} # sprite -> ordem de inserção (resolve colisões na mesma ordem de antes)
+        self.order_counter = count()
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.order[sprite] = next(self.order_counter)
+        self.pending_sprites.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.order[sprite]
+        if sprite in self.grid:
+            self.grid.remove(sprite)
+        else:
+            self.pending_sprites.remove(sprite)
+
+    def restore_order(self, sprite, order):
+        self.order[sprite] = order
+
+    def build_index(self):
+        """
+        Indexa as hitboxes dos sprites adicionados desde a última consulta.
+        """
+        for sprite in self.pending_sprites:
+            self.grid.insert(sprite, sprite.hitbox)
+        self.pending_sprites.clear()
+
+    def relocate(self, sprite):
+        """
+        Reindexa um sprite cuja hitbox se moveu (ex: NPC andando até o jogador).
+        """
+        if sprite in self.grid:
+            self.grid.remove(sprite)
+            self.grid.insert(sprite, sprite.hitbox)
+
+    def near(self, rect):
+        """
+        Retorna os obstáculos das células que o retângulo toca (fase larga da colisão).
+        """
+        self.build_index()
+        return sorted(self.grid.query(rect), key = self.order.get)
+
+class ChunkStreamer:
+    """
+    Constrói os sprites estáticos de um mapa grande por blocos, só perto do jogador.
+    Cada objeto do mapa vira uma "receita" (função que cria o sprite) guardada no bloco
+    da sua posição. Os blocos próximos são construídos; os distantes são destruídos
+    (os sprites saem de todos os grupos) e podem ser refeitos a partir das receitas.
+    """
+    def __init__(self, ordered_groups, chunk_size = STREAM_CHUNK_SIZE, load_radius = STREAM_LOAD_RADIUS, unload_radius = STREAM_UNLOAD_RADIUS):
+        # Grupos cuja ordem de inserção importa (desenho e colisão). Cada receita reserva a
+        # posição que o sprite teria se o mapa fosse construído inteiro, na ordem do TMX.
+        self.ordered_groups = ordered_groups
+        self.chunk_pixels = chunk_size * TILE_SIZE
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius
+        self.builders = {} # (coluna, linha) do bloco -> (receita, ordem reservada em cada grupo)
+        self.loaded = {} # (coluna, linha) do bloco -> sprites construídos
+        self.center = None # Bloco do jogador na última atualização
+
+    def get_chunk(self, pos):
+        return (int(pos[0] // self.chunk_pixels), int(pos[1] // self.chunk_pixels))
+
+    def fits(self, rect):
+        # Objetos maiores que um bloco (ex: paredes ao longo do mapa) não podem depender
+        # de um único bloco estar construído para existirem
+        return rect.width <= self.chunk_pixels and rect.height <= self.chunk_pixels
+
+    def add(self, pos, builder):
+        orders = [next(group.order_counter) for group in self.ordered_groups]
+        self.builders.setdefault(self.get_chunk(pos), []).append((builder, orders))
+
+    def build(self, chunk):
+        self.loaded[chunk] = []
+        for builder, orders in self.builders[chunk]:
+            sprite = builder()
+            for group, order in zip(self.ordered_groups, orders):
+                if sprite in group:
+                    group.restore_order(sprite, order)
+            self.loaded[chunk].append(sprite)
+
+    def unload(self, chunk):
+        for sprite in self.loaded.pop(chunk):
+            sprite.kill()
+
+    def update(self, pos):
+        """
+        Constrói os blocos dentro do raio de carga e descarta os que saíram do raio de descarte.
+        Só faz alguma coisa quando o jogador muda de bloco.
+        """
+        center = self.get_chunk(pos)
+        if center == self.center:
+            return
+        self.center = center
+
+        for chunk in list(self.loaded):
+            if max(abs(chunk[0] - center[0]), abs(chunk[1] - center[1])) > self.unload_radius:
+                self.unload(chunk)
+
+        for col in range(center[0] - self.load_radius, center[0] + self.load_radius + 1):
+            for row in range(center[1] - self.load_radius, center[1] + self.load_radius + 1):
+                if (col, row) in self.builders and (col, row) not in self.loaded:
+                    self.build((col, row))
+
+class Scene:
+    """
+    Tudo o que foi construído para um mapa: grupos de sprites, NPCs (com o estado deles),
+    índices de colisão e pontos de spawn do jogador.
+    Guardar a cena permite voltar ao mapa sem reconstruir nada a partir do TMX.
+    """
+    def __init__(self, streamed = False):
+        self.all_sprites = AllSprites() # Câmera e desenho ordenado
+        self.collision_sprites = CollisionSprites() # Paredes e obstáculos (com hash espacial das hitboxes)
+        self.character_sprites = pygame.sprite.Group() # NPCs
+        self.transition_sprites = pygame.sprite.Group() # Gatilhos de mudança de mapa
+        self.monster_sprites = pygame.sprite.Group() # Grama alta (encontros)
+        self.occupancy = None # Mapa de ocupação (linha de visão dos NPCs)
+        self.spawns = {} # 'pos' do Tiled (ex: 'house') -> (posição, direção) do jogador
+        # Mapas grandes: os sprites estáticos só existem perto do jogador
+        self.chunks = ChunkStreamer((self.all_sprites, self.collision_sprites)) if streamed else None
+
+    def add_static(self, rect, builder):
+        """
+        Registra um sprite estático do mapa. Em mapas pequenos ele é criado na hora;
+        em mapas grandes, só quando o jogador se aproximar do bloco dele.
+        """
+        if self.chunks and self.chunks.fits(rect):
+            self.chunks.add(rect.topleft, builder)
+        else:
+            builder()
+
+    def stream(self, pos):
+        if self.chunks:
+            self.chunks.update(pos)
+
 class BattleSprites(pygame.sprite.Group):
     """
     Grupo de sprites personalizado para a BATALHA.
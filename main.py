@@ -3,11 +3,17 @@ from game_data import *
 from pytmx.util_pygame import load_pygame
 from os.path import join
 from random import randint
+from collections import OrderedDict
+from functools import partial
 
 # Importações das classes personalizadas do jogo
-from sprites import Sprite, AnimatedSprite, MonsterPatchSprite, BorderSprite, CollidableSprite, TransitionSprite
+from sprites import Sprite, ClockedSprite, AnimationClock, MonsterPatchSprite, BorderSprite, CollidableSprite, TransitionSprite
 from entities import Player, Character
-from groups import AllSprites
+from groups import Scene
+from spatial import OccupancyGrid
+from map_loader import MapCache
+from monster_assets import MonsterAssets
+from audio_manager import AudioManager
 from dialog import DialogTree
 from monster_index import MonsterIndex
 from battle import Battle
@@ -51,12 +57,10 @@ class Game:
             2: Monster('araclaw', 12),
         }
 
-        # 3. Grupos de Sprites (Organização Visual e Lógica)
-        self.all_sprites = AllSprites() # Câmera e desenho ordenado
-        self.collision_sprites = pygame.sprite.Group() # Paredes e obstáculos
-        self.character_sprites = pygame.sprite.Group() # NPCs
-        self.transition_sprites = pygame.sprite.Group() # Gatilhos de mudança de mapa
-        self.monster_sprites = pygame.sprite.Group() # Grama alta (encontros)
+        # 3. Cenas (Grupos de Sprites de cada mapa já construído)
+        # Os grupos do mapa atual (all_sprites, collision_sprites...) são definidos em enter_scene
+        self.scenes = OrderedDict() # nome do mapa -> Scene, do menos para o mais usado
+        self.animation_clock = AnimationClock() # Quadro atual compartilhado por toda a água e costa
 
         # 4. Sistema de Transição de Tela (Fade in/out)
         self.transition_target = None # Para onde vamos? (Batalha, Mapa ou None)
@@ -69,14 +73,20 @@ class Game:
         # Carrega imagens, sons e mapas
         self.import_assets()
         
-        self.player = None
+        # O jogador é único e passa de cena em cena; a posição vem do ponto de spawn do mapa
+        self.player = Player(
+            pos = (0,0),
+            frames = self.overworld_frames['characters']['player'],
+            groups = (),
+            facing_direction = 'down',
+            collision_sprites = None)
         # Carrega o mapa inicial ('world') e define o ponto de spawn ('house')
-        self.setup(self.tmx_maps['world'], 'house')
-        self.audio['overworld'].play(-1) # Toca música em loop
+        self.setup('world', 'house')
+        self.audio.play_music('overworld') # Toca música em loop
 
         # 5. Inicialização de Overlays (Interfaces que pausam o jogo)
         self.dialog_tree = None
-        self.monster_index = MonsterIndex(self.player_monsters, self.fonts, self.monster_frames)
+        self.monster_index = MonsterIndex(self.player_monsters, self.fonts, self.monster_frames, self.monster_assets)
         self.index_open = False # Se o menu de monstros está aberto
         self.battle = None
         self.evolution = None
@@ -85,8 +95,13 @@ class Game:
     def import_assets(self):
         """
         Carrega todos os recursos gráficos, áudio e mapas para a memória.
+        Os arquivos de cada pasta são decodificados em paralelo (ver load_images em support.py).
         """
-        self.tmx_maps = tmx_importer('data', 'maps')
+        timer = LoadTimer()
+
+        # Mapas são carregados sob demanda (no máximo MAP_CACHE_SIZE na memória)
+        self.tmx_maps = MapCache('data', 'maps')
+        timer.lap('maps')
 
         # Gráficos do Mundo (Overworld)
         self.overworld_frames = {
@@ -94,33 +109,17 @@ class Game:
             'coast': coast_importer(24, 12, 'graphics', 'tilesets', 'coast'),
             'characters': all_character_import('graphics', 'characters')
         }
+        timer.lap('overworld')
 
         # Gráficos dos Monstros e UI
+        # Animações, ícones e contornos dos monstros são lidos sob demanda, por espécie
+        # (nomes normalizados para minúsculo; o arquivo vem do 'graphic_path' do MONSTER_DATA)
+        self.monster_assets = MonsterAssets('graphics', 'monsters')
         self.monster_frames = {
-            'icons': import_folder_dict('graphics', 'monsters'),
-            'monsters': monster_importer(4, 2, 'graphics', 'monsters'),
             'ui': import_folder_dict('graphics', 'ui'),
             'attacks': attack_importer('graphics', 'attacks')
         }
-
-        # --- TRATAMENTO DE ERROS DE NOMES (CRÍTICO) ---
-        # Alguns sistemas operacionais diferenciam 'Embercan' de 'embercan'.
-        # Este bloco converte todas as chaves de monstros para minúsculas e remove espaços.
-        raw_monsters = self.monster_frames['monsters']
-        standardized_monsters = {
-            name.strip().lower(): frames_data 
-            for name, frames_data in raw_monsters.items()
-        }
-        self.monster_frames['monsters'] = standardized_monsters
-        # ---------------------------------------------
-
-        # Cria ícones estáticos para a interface (pega o primeiro frame da animação)
-        self.icon_frames = {}
-        for name, frames_dict in self.monster_frames['monsters'].items():
-            # Pega a lista de animações (geralmente 'idle' ou a primeira disponível)
-            frames_list = list(frames_dict.values())[0]
-            # O frame 0 é usado como ícone estático no menu
-            self.icon_frames[name] = frames_list[0]
+        timer.lap('monsters')
 
         # Fontes e Imagens de Fundo
         self.fonts = {
@@ -129,86 +128,139 @@ class Game:
             'small': pygame.font.Font(join('graphics', 'fonts', 'PixeloidSans.ttf'), 14),
             'bold': pygame.font.Font(join('graphics', 'fonts', 'dogicapixelbold.otf'), 20),
         }
+        timer.lap('fonts')
         self.bg_frames = import_folder_dict('graphics', 'backgrounds')
         self.start_animation_frames = import_folder('graphics', 'other', 'star animation')
+        timer.lap('backgrounds')
     
-        # Áudio
-        self.audio = audio_importer('audio')
+        # Áudio (músicas em streaming, efeitos curtos carregados na memória)
+        self.audio = AudioManager('audio')
+        timer.lap('audio')
 
-    def setup(self, tmx_map, player_start_pos):
+        if SHOW_LOAD_TIMES:
+            timer.report()
+
+    def setup(self, map_name, player_start_pos):
         """
-        Reconstrói o mapa do jogo baseado no arquivo Tiled (TMX).
-        Limpa os sprites antigos e posiciona tiles, colisão e NPCs.
+        Entra em um mapa. Se ele já foi construído antes, reaproveita a cena guardada
+        (sprites, NPCs onde estavam, índices de colisão); senão, constrói a partir do TMX.
         """
-        # Limpa grupos antigos
-        for group in (self.all_sprites, self.collision_sprites, self.transition_sprites, self.character_sprites):
-            group.empty()
+        if map_name in self.scenes:
+            self.scenes.move_to_end(map_name)
+        else:
+            self.scenes[map_name] = self.build_scene(self.tmx_maps[map_name])
+            # Descarta a cena usada há mais tempo (a atual é sempre a mais recente)
+            while len(self.scenes) > SCENE_CACHE_SIZE:
+                self.scenes.popitem(last = False)
+        self.enter_scene(self.scenes[map_name], player_start_pos)
+
+    def enter_scene(self, scene, player_start_pos):
+        """
+        Troca os grupos ativos pelos da cena e coloca o jogador no ponto de spawn.
+        """
+        self.player.kill() # Sai do all_sprites do mapa anterior
+
+        self.scene = scene
+        self.all_sprites = scene.all_sprites
+        self.collision_sprites = scene.collision_sprites
+        self.character_sprites = scene.character_sprites
+        self.transition_sprites = scene.transition_sprites
+        self.monster_sprites = scene.monster_sprites
+        self.occupancy = scene.occupancy
+
+        pos, facing_direction = scene.spawns[player_start_pos]
+        self.player.place(pos, facing_direction, scene.collision_sprites)
+        self.player.add(scene.all_sprites)
+        scene.stream(self.player.rect.center) # Constrói os blocos em volta do spawn (mapas grandes)
+
+        # Pré-carrega em segundo plano os mapas para onde as transições deste levam
+        # (os que já têm cena construída não precisam do TMX)
+        targets = {sprite.target[0] for sprite in scene.transition_sprites}
+        self.tmx_maps.prefetch(targets - set(self.scenes))
+
+    def build_scene(self, tmx_map):
+        """
+        Constrói a cena de um mapa baseado no arquivo Tiled (TMX).
+        Posiciona tiles, colisão, NPCs e registra os pontos de spawn do jogador.
+        Em mapas grandes, os sprites estáticos viram receitas construídas por blocos (streaming).
+        """
+        scene = Scene(streamed = tmx_map.width * tmx_map.height >= STREAM_MAP_AREA)
+        blocked_rects = [] # Obstáculos para a linha de visão (não dependem dos blocos construídos)
 
         # Camadas de Terreno (Chão estático)
+        # Não vira sprite: os tiles são pré-renderizados em blocos grandes pelo AllSprites
         for layer in ['Terrain', 'Terrain Top']:
             for x, y, surf in tmx_map.get_layer_by_name(layer).tiles():
-                Sprite((x * TILE_SIZE, y * TILE_SIZE), surf, self.all_sprites, WORLD_LAYERS['bg'])
+                scene.all_sprites.terrain.add_tile((x * TILE_SIZE, y * TILE_SIZE), surf)
 
         # Camada de Água (Animada)
         for obj in tmx_map.get_layer_by_name('Water'):
             # Preenche a área retangular definida no Tiled com tiles de água
             for x in range(int(obj.x), int(obj.x + obj.width), TILE_SIZE):
                 for y in range(int(obj.y), int(obj.y + obj.height), TILE_SIZE):
-                    AnimatedSprite((x,y), self.overworld_frames['water'], self.all_sprites, WORLD_LAYERS['water'])
+                    scene.add_static(pygame.FRect(x, y, TILE_SIZE, TILE_SIZE), partial(ClockedSprite, (x,y), self.overworld_frames['water'], scene.all_sprites, self.animation_clock, WORLD_LAYERS['water']))
 
         # Camada de Costa/Praia (Lógica complexa para bordas de água)
         for obj in tmx_map.get_layer_by_name('Coast'):
             terrain = obj.properties['terrain']
             side = obj.properties['side']
-            AnimatedSprite((obj.x, obj.y), self.overworld_frames['coast'][terrain][side], self.all_sprites, WORLD_LAYERS['bg'])
+            scene.add_static(pygame.FRect(obj.x, obj.y, TILE_SIZE, TILE_SIZE), partial(ClockedSprite, (obj.x, obj.y), self.overworld_frames['coast'][terrain][side], scene.all_sprites, self.animation_clock, WORLD_LAYERS['bg']))
         
         # Objetos (Árvores, Pedras, Decoração)
         for obj in tmx_map.get_layer_by_name('Objects'):
+            rect = obj.image.get_frect(topleft = (obj.x, obj.y))
             if obj.name == 'top':
                 # Objetos puramente visuais que ficam acima do chão
-                Sprite((obj.x, obj.y), obj.image, self.all_sprites, WORLD_LAYERS['top'])
+                scene.add_static(rect, partial(Sprite, (obj.x, obj.y), obj.image, scene.all_sprites, WORLD_LAYERS['top']))
             else:
                 # Objetos que bloqueiam o jogador (Collidable)
-                CollidableSprite((obj.x, obj.y), obj.image, (self.all_sprites, self.collision_sprites))
+                scene.add_static(rect, partial(CollidableSprite, (obj.x, obj.y), obj.image, (scene.all_sprites, scene.collision_sprites)))
+                blocked_rects.append(rect)
 
         # Objetos de Transição (Portas e passagens para outros mapas)
+        # São poucos e não são desenhados, então existem sempre (mesmo em mapas grandes)
         for obj in tmx_map.get_layer_by_name('Transition'):
-            TransitionSprite((obj.x, obj.y), (obj.width, obj.height), (obj.properties['target'], obj.properties['pos']), self.transition_sprites)
+            TransitionSprite((obj.x, obj.y), (obj.width, obj.height), (obj.properties['target'], obj.properties['pos']), scene.transition_sprites)
 
         # Colisões Invisíveis (Paredes desenhadas no Tiled)
         for obj in tmx_map.get_layer_by_name('Collisions'):
-            BorderSprite((obj.x, obj.y), pygame.Surface((obj.width, obj.height)), self.collision_sprites)
+            rect = pygame.FRect(obj.x, obj.y, obj.width, obj.height)
+            scene.add_static(rect, partial(BorderSprite, (obj.x, obj.y), pygame.Surface((obj.width, obj.height)), scene.collision_sprites))
+            blocked_rects.append(rect)
 
         # Grama Alta (Áreas de encontro de monstros)
         for obj in tmx_map.get_layer_by_name('Monsters'):
-            MonsterPatchSprite((obj.x, obj.y), obj.image, (self.all_sprites, self.monster_sprites), obj.properties['biome'], obj.properties['monsters'], obj.properties['level'])
+            scene.add_static(obj.image.get_frect(topleft = (obj.x, obj.y)), partial(MonsterPatchSprite, (obj.x, obj.y), obj.image, (scene.all_sprites, scene.monster_sprites), obj.properties['biome'], obj.properties['monsters'], obj.properties['level']))
+
+        # Mapa de ocupação para a linha de visão dos NPCs (Collisions + Objects, montado uma vez)
+        scene.occupancy = OccupancyGrid(tmx_map.width * TILE_SIZE, tmx_map.height * TILE_SIZE, blocked_rects)
 
         # Entidades (Player e NPCs)
+        # Os NPCs nunca entram no streaming: guardam estado (derrotado, direção, posição)
         for obj in tmx_map.get_layer_by_name('Entities'):
             if obj.name == 'Player':
-                # Cria o jogador apenas se o 'pos' (ex: 'house') bater com o argumento da função
-                if obj.properties['pos'] == player_start_pos:
-                    self.player = Player(
-                        pos = (obj.x, obj.y), 
-                        frames = self.overworld_frames['characters']['player'], 
-                        groups = self.all_sprites,
-                        facing_direction = obj.properties['direction'], 
-                        collision_sprites = self.collision_sprites)
+                # Registra o ponto de spawn (ex: 'house'); o jogador é posicionado em enter_scene
+                scene.spawns[obj.properties['pos']] = ((obj.x, obj.y), obj.properties['direction'])
             else:
                 # Cria NPCs (Treinadores ou Enfermeiras)
                 Character(
                     pos = (obj.x, obj.y), 
                     frames = self.overworld_frames['characters'][obj.properties['graphic']], 
-                    groups = (self.all_sprites, self.collision_sprites, self.character_sprites),
+                    groups = (scene.all_sprites, scene.collision_sprites, scene.character_sprites),
                     facing_direction = obj.properties['direction'],
                     character_data = TRAINER_DATA[obj.properties['character_id']], # Pega dados do settings.py
                     player = self.player,
                     create_dialog = self.create_dialog,
-                    collision_sprites = self.collision_sprites,
+                    collision_sprites = scene.collision_sprites,
+                    occupancy = scene.occupancy,
                     radius = obj.properties['radius'],
                     nurse = obj.properties['character_id'] == 'Nurse',
                     notice_sound = self.audio['notice'])
 
+        # Monta o hash espacial de colisão com todos os obstáculos do mapa
+        scene.collision_sprites.build_index()
+        return scene
+
     # --- SISTEMA DE DIÁLOGO ---
     def input(self):
         """
@@ -253,14 +305,14 @@ class Game:
         
         # Caso 2: Treinador não derrotado -> Inicia Batalha
         elif not character.character_data['defeated']:
-            self.audio['overworld'].stop()
-            self.audio['battle'].play(-1)
+            self.audio.play_music('battle')
             
             # Prepara a transição para o modo Batalha
             self.transition_target = Battle(
                 player_monsters = self.player_monsters, 
                 opponent_monsters = character.monsters, 
                 monster_frames = self.monster_frames, 
+                monster_assets = self.monster_assets, 
                 bg_surf = self.bg_frames[character.character_data['biome']], 
                 fonts = self.fonts, 
                 end_battle = self.end_battle,
@@ -300,8 +352,8 @@ class Game:
                 elif self.transition_target == 'level':
                     self.battle = None # Sai da Batalha
                 else:
-                    # Muda de Mapa (setup novo)
-                    self.setup(self.tmx_maps[self.transition_target[0]], self.transition_target[1])
+                    # Muda de Mapa (reaproveita a cena se o mapa já foi visitado)
+                    self.setup(self.transition_target[0], self.transition_target[1])
                 
                 # Inverte o fade para clarear novamente
                 self.tint_mode = 'untint'
@@ -316,7 +368,7 @@ class Game:
         """
         Chamado de dentro da classe Battle quando a luta acaba.
         """
-        self.audio['battle'].stop()
+        self.audio.stop_music()
         self.transition_target = 'level' # Código para voltar ao mapa
         self.tint_mode = 'tint'
         
@@ -334,22 +386,21 @@ class Game:
         for index, monster in self.player_monsters.items():
             if monster.evolution:
                 if monster.level == monster.evolution[1]:
-                    self.audio['evolution'].play()
+                    self.audio.play_music('evolution', loops = 0)
                     self.player.block()
                     # Inicia o Overlay de Evolução
-                    self.evolution = Evolution(self.monster_frames['monsters'], monster.name, monster.evolution[0], self.fonts['bold'], self.end_evolution, self.start_animation_frames)
+                    self.evolution = Evolution(self.monster_assets, monster.name, monster.evolution[0], self.fonts['bold'], self.end_evolution, self.start_animation_frames)
                     # Substitui o monstro antigo pelo novo
                     self.player_monsters[index] = Monster(monster.evolution[0], monster.level)
         
         # Se não houver evolução, volta a música do mapa
         if not self.evolution:
-            self.audio['overworld'].play(-1)
+            self.audio.play_music('overworld')
 
     def end_evolution(self):
         self.evolution = None
         self.player.unblock()
-        self.audio['evolution'].stop()
-        self.audio['overworld'].play(-1)
+        self.audio.play_music('overworld')
 
     # --- SISTEMA DE ENCONTROS ALEATÓRIOS ---
     def check_monster(self):
@@ -367,14 +418,14 @@ class Game:
             # Reseta timer com valor aleatório para o próximo encontro
             self.encounter_timer.duration = randint(800, 2500)
             self.player.block()
-            self.audio['overworld'].stop()
-            self.audio['battle'].play(-1)
+            self.audio.play_music('battle')
             
             # Cria batalha com monstros definidos no bioma da grama
             self.transition_target = Battle(
                 player_monsters = self.player_monsters, 
                 opponent_monsters = {index:Monster(monster, sprites[0].level + randint(-3,3)) for index, monster in enumerate(sprites[0].monsters)}, 
                 monster_frames = self.monster_frames, 
+                monster_assets = self.monster_assets, 
                 bg_surf = self.bg_frames[sprites[0].biome], 
                 fonts = self.fonts, 
                 end_battle = self.end_battle,
@@ -404,7 +455,10 @@ class Game:
             self.encounter_timer.update()
             self.input()
             self.transition_check()
-            self.all_sprites.update(dt) # Move personagens, anima água, etc.
+            self.scene.stream(self.player.rect.center) # Constrói/descarta blocos do mapa (mapas grandes)
+            self.animation_clock.update(dt) # Anima água e costa (uma vez para o mapa todo)
+            self.audio.update(dt) # Transição entre músicas
+            self.all_sprites.update(dt) # Move personagens e NPCs (tiles estáticos são ignorados)
             self.check_monster()
             
             # Desenho (Render)
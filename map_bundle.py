@@ -0,0 +1,234 @@
+from settings import *
+from os.path import join, dirname, normpath, exists, splitext, basename
+from os import walk, stat, makedirs
+from xml.etree import ElementTree
+from pytmx import TiledMap, TiledTileLayer, TiledObjectGroup, TileFlags
+from pytmx.util_pygame import handle_transformation, smart_convert
+from array import array
+import json
+import mmap
+import struct
+import sys
+
+# ==============================================================================
+# FORMATO BINÁRIO COMPILADO DOS MAPAS (.pkmap)
+# ==============================================================================
+# Ler o XML do Tiled com o pytmx é a parte mais cara do carregamento de um mapa.
+# Este módulo compila cada data/maps/*.tmx (offline) num pacote binário compacto:
+#
+#   [cabeçalho] MAGIC + versão + tamanho do JSON
+#   [JSON]      dimensões, tabela de imagens (arquivo, recorte, flips), camadas,
+#               nomes e propriedades dos objetos, arquivos de origem (para saber se está velho)
+#   [tiles]     uma matriz uint16 (little-endian) de índices de imagem por camada de tiles
+#   [objetos]   registros empacotados (x, y, largura, altura, imagem, nome, propriedades)
+#
+# O jogo abre o pacote com mmap e só cai no TMX se o pacote estiver desatualizado.
+#
+# Uso (na raiz do projeto): python map_bundle.py
+
+MAGIC = b'PKMAP'
+VERSION = 1
+HEADER = struct.Struct('<5sHI') # magic, versão, tamanho do JSON
+OBJECT_RECORD = struct.Struct('<ddddiii') # x, y, largura, altura, imagem, nome, propriedades
+
+def bundle_path(tmx_path, bundle_folder):
+    return join(bundle_folder, splitext(basename(tmx_path))[0] + '.pkmap')
+
+def get_sources(tmx_path):
+    """
+    Arquivos dos quais o mapa depende: o próprio .tmx e os tilesets externos (.tsx).
+    """
+    sources = [normpath(tmx_path)]
+    for tileset in ElementTree.parse(tmx_path).getroot().iter('tileset'):
+        if 'source' in tileset.attrib:
+            sources.append(normpath(join(dirname(tmx_path), tileset.attrib['source'])))
+    return sources
+
+def get_signature(path):
+    info = stat(path)
+    return [info.st_mtime_ns, info.st_size]
+
+# ==============================================================================
+# COMPILADOR (OFFLINE)
+# ==============================================================================
+
+def compile_map(tmx_path, output_path):
+    """
+    Converte um .tmx em pacote binário. Não precisa de janela nem de pygame:
+    o carregador padrão do pytmx só devolve (arquivo, recorte, flips) para cada imagem.
+    """
+    tmx_map = TiledMap(tmx_path)
+
+    # Tabela de imagens: o índice é o mesmo 'gid' interno que o pytmx usa nas camadas
+    images = []
+    for image in tmx_map.images:
+        if image is None:
+            images.append(None)
+        else:
+            file, rect, flags = image
+            images.append([normpath(file).replace('\\', '/'), list(rect) if rect else None, list(flags) if flags else None])
+
+    strings, string_index = [], {}
+    def intern(value):
+        if value not in string_index:
+            string_index[value] = len(strings)
+            strings.append(value)
+        return string_index[value]
+
+    layers, tile_data, object_data = [], bytearray(), bytearray()
+    for layer in tmx_map.layers:
+        if isinstance(layer, TiledTileLayer):
+            offset = len(tile_data)
+            for row in layer.data:
+                tile_data += struct.pack(f'<{len(row)}H', *row)
+            layers.append({'name': layer.name, 'type': 'tiles', 'width': layer.width, 'height': layer.height, 'offset': offset})
+        elif isinstance(layer, TiledObjectGroup):
+            offset = len(object_data)
+            for obj in layer:
+                object_data += OBJECT_RECORD.pack(
+                    obj.x, obj.y, obj.width, obj.height,
+                    obj.gid if obj.gid else -1,
+                    intern(obj.name) if obj.name else -1,
+                    intern(json.dumps(obj.properties, default = str, sort_keys = True)))
+            layers.append({'name': layer.name, 'type': 'objects', 'count': len(layer), 'offset': offset})
+
+    header = {
+        'width': tmx_map.width,
+        'height': tmx_map.height,
+        'tilewidth': tmx_map.tilewidth,
+        'tileheight': tmx_map.tileheight,
+        'sources': {source: get_signature(source) for source in get_sources(tmx_path)},
+        'images': images,
+        'layers': layers,
+        'strings': strings,
+        'tile_bytes': len(tile_data),
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    # Alinha as matrizes de tiles em 2 bytes para poderem ser lidas direto do mmap
+    padding = b'\0' * ((HEADER.size + len(header_bytes)) % 2)
+
+    makedirs(dirname(output_path) or '.', exist_ok = True)
+    with open(output_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(header_bytes) + len(padding)))
+        file.write(header_bytes + padding)
+        file.write(tile_data)
+        file.write(object_data)
+
+def compile_all(*path, output = MAP_BUNDLE_FOLDER):
+    for folder_path, sub_folders, file_names in walk(join(*path)):
+        for file in file_names:
+            if file.endswith('.tmx'):
+                tmx_path = join(folder_path, file)
+                compile_map(tmx_path, bundle_path(tmx_path, output))
+                print(f'{tmx_path} -> {bundle_path(tmx_path, output)}')
+
+# ==============================================================================
+# CARREGADOR (JOGO)
+# ==============================================================================
+
+def read_header(file):
+    magic, version, header_size = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        return None
+    return json.loads(file.read(header_size).rstrip(b'\0'))
+
+def is_stale(path):
+    """
+    O pacote está velho se não existe, é de outra versão ou se algum arquivo de origem mudou.
+    """
+    if not exists(path):
+        return True
+    with open(path, 'rb') as file:
+        header = read_header(file)
+    if header is None:
+        return True
+    return any(not exists(source) or get_signature(source) != signature for source, signature in header['sources'].items())
+
+class CompiledTileLayer:
+    """
+    Camada de tiles (matriz uint16 de índices de imagem, copiada do pacote).
+    Imita a interface do pytmx usada pelo jogo: tiles() -> (x, y, superfície).
+    """
+    def __init__(self, name, width, height, data, images):
+        self.name, self.width, self.height = name, width, height
+        self.data = data
+        self.images = images
+
+    def tiles(self):
+        for index, gid in enumerate(self.data):
+            if gid:
+                yield index % self.width, index // self.width, self.images[gid]
+
+class CompiledObject:
+    """
+    Objeto de uma camada de objetos, com os mesmos atributos que o jogo lê do pytmx.
+    """
+    def __init__(self, x, y, width, height, name, image, properties):
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.name = name
+        self.image = image
+        self.properties = properties
+
+class CompiledMap:
+    """
+    Mapa carregado de um pacote .pkmap (substitui o TiledMap do pytmx no jogo).
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            header = read_header(file)
+            data_start = file.tell()
+
+        self.width, self.height = header['width'], header['height']
+        self.tilewidth, self.tileheight = header['tilewidth'], header['tileheight']
+
+        # Cada arquivo de tileset é lido uma vez; os tiles são recortes dele (como no load_pygame)
+        sheets = {}
+        self.images = []
+        for image in header['images']:
+            if image is None:
+                self.images.append(None)
+                continue
+            file, rect, flags = image
+            if file not in sheets:
+                sheets[file] = pygame.image.load(file)
+            tile = sheets[file].subsurface(rect) if rect else sheets[file].copy()
+            if flags:
+                tile = handle_transformation(tile, TileFlags(*flags))
+            self.images.append(smart_convert(tile, None, True))
+
+        tiles_start = data_start
+        objects_start = data_start + header['tile_bytes']
+        strings = header['strings']
+
+        # As camadas são copiadas do mmap (tiles em array('H'), objetos já desempacotados)
+        # e o arquivo é fechado em seguida: um mapa descartado pelo MapCache não deixa
+        # descritor nem mapeamento aberto
+        self.layers = []
+        self.layernames = {}
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as buffer, memoryview(buffer) as view:
+            for layer in header['layers']:
+                if layer['type'] == 'tiles':
+                    start = tiles_start + layer['offset']
+                    data = array('H')
+                    data.frombytes(view[start:start + layer['width'] * layer['height'] * 2])
+                    if sys.byteorder == 'big':
+                        data.byteswap() # O pacote é little-endian
+                    new_layer = CompiledTileLayer(layer['name'], layer['width'], layer['height'], data, self.images)
+                else:
+                    start = objects_start + layer['offset']
+                    new_layer = [
+                        CompiledObject(x, y, width, height,
+                            strings[name] if name >= 0 else None,
+                            self.images[gid] if gid >= 0 else None,
+                            json.loads(strings[properties]))
+                        for x, y, width, height, gid, name, properties
+                        in OBJECT_RECORD.iter_unpack(view[start:start + layer['count'] * OBJECT_RECORD.size])]
+                self.layers.append(new_layer)
+                # Nomes repetidos: como no pytmx, vale a última camada com o nome
+                self.layernames[layer['name']] = new_layer
+
+    def get_layer_by_name(self, name):
+        return self.layernames[name]
+
+if __name__ == '__main__':
+    compile_all('data', 'maps')
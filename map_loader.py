@@ -0,0 +1,101 @@
+from settings import *
+from os.path import join, splitext
+from os import walk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pytmx.util_pygame import load_pygame # Biblioteca externa para ler mapas do Tiled (.tmx)
+from map_bundle import CompiledMap, bundle_path, is_stale
+
+# ==============================================================================
+# CARREGAMENTO DE MAPAS SOB DEMANDA
+# ==============================================================================
+
+class MapCache:
+    """
+    Substitui o carregamento de todos os .tmx no início do jogo.
+    Os mapas são lidos na primeira vez que forem pedidos (self.tmx_maps['world'])
+    e no máximo 'capacity' ficam na memória: o usado há mais tempo é descartado (LRU).
+    As superfícies dos tilesets dele são liberadas quando nada mais as usa (nem a cena já
+    construída, nem um pré-carregamento em andamento).
+
+    Mapas vizinhos (destinos das transições) podem ser pré-carregados em segundo plano
+    com prefetch(). A leitura do XML e das imagens roda numa thread separada
+    (o carregamento de PNG do pygame libera o GIL), então o fade de transição
+    não trava esperando um mapa frio.
+    """
+    def __init__(self, *path, capacity = MAP_CACHE_SIZE):
+        self.capacity = max(1, capacity) # O mapa atual nunca pode ser descartado
+        self.maps = OrderedDict() # nome -> TiledMap carregado, do menos para o mais usado
+
+        # Pré-carregamento em segundo plano (uma thread basta: os mapas são pequenos)
+        self.executor = ThreadPoolExecutor(max_workers = 1)
+        self.prefetching = {} # nome -> Future com o TiledMap sendo carregado
+        # Estatísticas para profiling, contando todo pedido (self.tmx_maps[nome]):
+        # 'hits' = o mapa estava pronto (já na memória ou com o pré-carregamento concluído),
+        # 'prefetched' = dos hits, os que vieram de um pré-carregamento concluído,
+        # 'misses' = teve que carregar (ou esperar o carregamento) na thread principal
+        self.stats = {'hits': 0, 'prefetched': 0, 'misses': 0}
+
+        # Só indexa os arquivos (barato); nada é lido do disco ainda
+        self.paths = {}
+        for folder_path, sub_folders, file_names in walk(join(*path)):
+            for file in file_names:
+                name, extension = splitext(file)
+                if extension == '.tmx':
+                    self.paths[name] = join(folder_path, file)
+
+    def __getitem__(self, name):
+        if name in self.maps:
+            self.maps.move_to_end(name)
+            self.stats['hits'] += 1
+        else:
+            future = self.prefetching.pop(name, None)
+            # Ainda na fila atrás de outros pré-carregamentos (cancel() só consegue antes de
+            # começar): carregar aqui mesmo é mais rápido que esperar a thread chegar nele
+            if future and not future.done() and future.cancel():
+                future = None
+            if future and future.done():
+                self.stats['hits'] += 1
+                self.stats['prefetched'] += 1
+            else:
+                self.stats['misses'] += 1
+            # Se o pré-carregamento já está rodando, esperar por ele é mais rápido que recomeçar
+            self.maps[name] = future.result() if future else self.load(name)
+            while len(self.maps) > self.capacity:
+                self.evict()
+        return self.maps[name]
+
+    def prefetch(self, names):
+        """
+        Começa a carregar em segundo plano os mapas pedidos que ainda não estão na memória.
+        Pré-carregamentos de mapas que deixaram de ser vizinhos são cancelados/descartados,
+        para que a memória continue dependendo só do mapa atual e dos vizinhos dele.
+        """
+        names = {name for name in names if name in self.paths and name not in self.maps}
+        for name in list(self.prefetching):
+            if name not in names:
+                self.prefetching.pop(name).cancel()
+        for name in names:
+            if name not in self.prefetching:
+                self.prefetching[name] = self.executor.submit(self.load, name)
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def keys(self):
+        return self.paths.keys()
+
+    def load(self, name):
+        # Usa o pacote binário compilado se ele estiver em dia com o .tmx; senão, lê o XML
+        compiled_path = bundle_path(self.paths[name], MAP_BUNDLE_FOLDER)
+        if not is_stale(compiled_path):
+            return CompiledMap(compiled_path)
+        return load_pygame(self.paths[name])
+
+    def evict(self):
+        """
+        Remove o mapa usado há mais tempo. O cache só solta a referência: quem ainda usa
+        o mapa (ex: get_tile_image numa cena viva) continua funcionando, e a memória é
+        liberada quando a última referência sumir.
+        """
+        self.maps.popitem(last = False)
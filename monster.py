@@ -1,6 +1,30 @@
 from game_data import MONSTER_DATA, ATTACK_DATA
 from random import randint
 
+# Atributos e habilidades derivados de (espécie, nível), calculados uma vez e
+# compartilhados por todos os monstros iguais (ex: os 3 ibyracy nível 15 do treinador o6)
+LEVEL_DATA = {}
+
+def get_level_data(name, level):
+    """
+    Retorna (atributos, get_stats(), habilidades desbloqueadas) da espécie no nível.
+    """
+    key = (name, level)
+    if key not in LEVEL_DATA:
+        base_stats = MONSTER_DATA[name]['stats']
+        stats = {stat: value * level for stat, value in base_stats.items() if stat != 'element'}
+        summary = {
+            'health': stats['max_health'],
+            'energy': stats['max_energy'],
+            'attack': stats['attack'],
+            'defense': stats['defense'],
+            'speed': stats['speed'],
+            'recovery': stats['recovery'],
+        }
+        abilities = [ability for lvl, ability in MONSTER_DATA[name]['abilities'].items() if level >= lvl]
+        LEVEL_DATA[key] = (stats, summary, abilities)
+    return LEVEL_DATA[key]
+
 class Monster:
     """
     Classe que representa a Lógica e os Dados de um monstro.
@@ -8,7 +32,8 @@ class Monster:
     Não lida com imagens ou desenhos.
     """
     def __init__(self, name, level):
-        self.name, self.level = name, level
+        self.name = name
+        self.level = level # Também carrega os atributos do nível (ver a propriedade 'level')
         self.paused = False # Se True, o monstro para de ganhar iniciativa (pausa no turno)
 
         # --- INICIALIZAÇÃO DE ESTATÍSTICAS ---
@@ -38,39 +63,59 @@ class Monster:
         # Representação em string para debug (aparece no print do console)
         return f'monster: {self.name}, lvl: {self.level}'
 
+    # --- NÍVEL E ENERGIA ---
+    # A UI da batalha e o índice consultam atributos e habilidades várias vezes por quadro.
+    # Em vez de recalcular a cada chamada, o que depende do nível vem de get_level_data
+    # (trocado ao subir de nível; uma evolução é um Monster novo, com outra espécie), e a
+    # lista de habilidades pagáveis só é refeita quando a energia muda.
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = value
+        self.stats, self.stats_summary, self.unlocked_abilities = get_level_data(self.name, value)
+        self.affordable = None
+
+    @property
+    def energy(self):
+        return self._energy
+
+    @energy.setter
+    def energy(self, value):
+        if value != getattr(self, '_energy', None):
+            self._energy = value
+            self.affordable = None
+
     def get_stat(self, stat):
         """
         Retorna o valor atual de um atributo específico (Ataque, Defesa, etc)
         multiplicado pelo nível do monstro.
         """
-        return self.base_stats[stat] * self.level
+        return self.stats[stat]
 
     def get_stats(self):
         """
         Retorna um dicionário com TODOS os atributos calculados para o nível atual.
-        Útil para preencher a UI de detalhes.
+        Útil para preencher a UI de detalhes. (Compartilhado: não altere o dicionário.)
         """
-        return {
-            'health': self.get_stat('max_health'),
-            'energy': self.get_stat('max_energy'),
-            'attack': self.get_stat('attack'),
-            'defense': self.get_stat('defense'),
-            'speed': self.get_stat('speed'),
-            'recovery': self.get_stat('recovery'),
-        }
+        return self.stats_summary
 
     def get_abilities(self, all=True):
         """
         Retorna a lista de habilidades que o monstro pode usar.
         all=True: Retorna todas as habilidades desbloqueadas pelo nível.
         all=False: Retorna apenas as desbloqueadas QUE o monstro tem energia para pagar.
+        As listas são guardadas: não altere o resultado.
         """
         if all:
-            # Lista de compreensão: Pega habilidade se Nível do Monstro >= Nível Desbloqueio
-            return [ability for lvl, ability in self.abilities.items() if self.level >= lvl]
-        else:
+            # Habilidades com Nível do Monstro >= Nível Desbloqueio
+            return self.unlocked_abilities
+        if self.affordable is None:
             # Filtro adicional: Verifica se o Custo (ATTACK_DATA) < Energia Atual
-            return [ability for lvl, ability in self.abilities.items() if self.level >= lvl and ATTACK_DATA[ability]['cost'] < self.energy]
+            self.affordable = [ability for ability in self.unlocked_abilities if ATTACK_DATA[ability]['cost'] < self.energy]
+        return self.affordable
 
     def get_info(self):
         """
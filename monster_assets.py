@@ -0,0 +1,183 @@
+from settings import *
+from game_data import MONSTER_DATA
+from support import import_tilemaps, outline_creator
+from surface_cache import get_cache_path, load_frames, save_frames
+from os.path import join, basename, splitext
+from os import walk
+from collections import OrderedDict
+
+class MonsterAssets:
+    """
+    Gráficos dos monstros carregados sob demanda.
+    Uma sessão de jogo só encontra algumas espécies, então em vez de ler todas as folhas
+    na inicialização, cada espécie é lida (e recortada) na primeira vez que aparece.
+    O que já foi lido fica na memória até passar do orçamento (em bytes de pixels);
+    aí as entradas usadas há mais tempo são descartadas (LRU) e relidas se voltarem.
+    Entradas presas (acquire) por monstros em campo nunca são descartadas, nem acima do orçamento.
+    """
+    def __init__(self, *path, cols = 4, rows = 2, budget = MONSTER_ASSET_BUDGET):
+        self.cols, self.rows = cols, rows
+        self.budget = budget
+        self.used = 0 # Bytes de pixels guardados no momento
+        self.entries = OrderedDict() # (tipo, nome) -> (gráficos, bytes), do menos para o mais usado
+        self.pins = {} # (tipo, nome) -> quantos acquire ainda seguram a entrada
+
+        # Nome do arquivo (minúsculo, sem extensão) -> caminho. Evita problemas de maiúsculas
+        # entre sistemas (ex: 'Shockroach.png')
+        self.paths = {}
+        for folder_path, sub_folders, file_names in walk(join(*path)):
+            for file_name in file_names:
+                self.paths[splitext(file_name)[0].strip().lower()] = join(folder_path, file_name)
+
+    def get_path(self, name):
+        # O nome do arquivo pode ser diferente do nome do monstro (ex: 'sapling' -> sagreen.png)
+        name = name.strip().lower()
+        if name in MONSTER_DATA and 'graphic_path' in MONSTER_DATA[name]:
+            name = splitext(basename(MONSTER_DATA[name]['graphic_path']))[0].lower()
+        return self.paths[name]
+
+    def get_size(self, surfaces):
+        return sum(surf.get_width() * surf.get_height() * surf.get_bytesize() for surf in surfaces)
+
+    def get(self, kind, name, load):
+        """
+        Retorna a entrada do cache ou carrega com 'load' e guarda, descartando
+        as usadas há mais tempo até caber no orçamento (a nova nunca é descartada).
+        """
+        key = (kind, name)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+        graphics, size = load()
+        self.store(key, graphics, size)
+        return graphics
+
+    def store(self, key, graphics, size):
+        self.entries[key] = (graphics, size)
+        self.used += size
+        self.trim(key)
+
+    def trim(self, keep = None):
+        # Descarta as entradas usadas há mais tempo até caber no orçamento, pulando as presas
+        for key in list(self.entries):
+            if self.used <= self.budget:
+                break
+            if key != keep and key not in self.pins:
+                self.discard(key)
+
+    def discard(self, key):
+        graphics, size = self.entries.pop(key)
+        self.used -= size
+
+    def pin(self, key):
+        self.pins[key] = self.pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        self.pins[key] -= 1
+        if not self.pins[key]:
+            del self.pins[key]
+
+    def acquire(self, name, mirrored = False):
+        """
+        Gráficos de um monstro que vai a campo: (quadros, contornos, silhuetas).
+        Ficam presos no cache até o release correspondente, para que carregar outras
+        espécies não descarte (e depois releia em outras superfícies) o que um sprite está usando.
+        """
+        suffix = ' mirrored' if mirrored else ''
+        frames = self.frames(name, mirrored)
+        self.pin((f'frames{suffix}', name))
+        outlines = self.outlines(name, mirrored)
+        self.pin((f'outlines{suffix}', name))
+        silhouettes = self.silhouettes(name, mirrored, frames)
+        self.pin((f'silhouettes{suffix}', name))
+        return frames, outlines, silhouettes
+
+    def release(self, name, mirrored = False):
+        # Solta o que acquire prendeu; o que passar do orçamento volta a poder ser descartado
+        suffix = ' mirrored' if mirrored else ''
+        for kind in ('frames', 'outlines', 'silhouettes'):
+            self.unpin((f'{kind}{suffix}', name))
+        self.trim()
+
+    def get_mirrored(self, kind, name, source):
+        """
+        Versão espelhada (olhando para a direita) de um conjunto de animações,
+        feita uma vez por espécie e compartilhada por todas as batalhas e trocas.
+        """
+        def load():
+            mirrored = {state: [pygame.transform.flip(frame, True, False) for frame in frames] for state, frames in source(name).items()}
+            return mirrored, self.get_size([surf for frames in mirrored.values() for surf in frames])
+        return self.get(f'{kind} mirrored', name, load)
+
+    def frames(self, name, mirrored = False):
+        """
+        Animações da espécie: {'idle': [...], 'attack': [...]}.
+        mirrored: Espelhadas na horizontal (monstros do lado do jogador).
+        """
+        if mirrored:
+            return self.get_mirrored('frames', name, self.frames)
+
+        def load():
+            frame_dict = import_tilemaps(self.cols, self.rows, [self.get_path(name)], compact = True)[0]
+            frames = {state: [frame_dict[(col, row)] for col in range(self.cols)] for row, state in enumerate(('idle', 'attack'))}
+            return frames, self.get_size(frame_dict.values())
+        return self.get('frames', name, load)
+
+    def icon(self, name):
+        """
+        Ícone estático da espécie (primeiro quadro de 'idle').
+        É uma cópia, para continuar na memória mesmo se a folha for descartada.
+        """
+        def load():
+            surf = self.frames(name)['idle'][0].copy()
+            return surf, self.get_size([surf])
+        return self.get('icon', name, load)
+
+    def outlines(self, name, mirrored = False):
+        """
+        Contornos brancos de seleção da espécie, no mesmo formato de frames().
+        São gerados uma vez e guardados no cache em disco junto com os quadros da folha.
+        """
+        if mirrored:
+            return self.get_mirrored('outlines', name, self.outlines)
+
+        def load():
+            states = ('idle', 'attack')
+            cache_path = get_cache_path(self.get_path(name), self.cols, self.rows, f'outline{BATTLE_OUTLINE_WIDTH}') if USE_SURFACE_CACHE else None
+            frame_dict = load_frames(cache_path) if cache_path else None
+            if frame_dict is None:
+                outlines = outline_creator({name: self.frames(name)}, BATTLE_OUTLINE_WIDTH)[name]
+                frame_dict = {(col, row): outlines[state][col] for row, state in enumerate(states) for col in range(self.cols)}
+                if cache_path:
+                    save_frames(cache_path, frame_dict, self.cols, self.rows)
+            else:
+                outlines = {state: [frame_dict[(col, row)] for col in range(self.cols)] for row, state in enumerate(states)}
+            return outlines, self.get_size(frame_dict.values())
+        return self.get('outlines', name, load)
+
+    def silhouettes(self, name, mirrored = False, frames = None):
+        """
+        Silhueta branca de cada quadro da espécie, num dicionário indexado pelo próprio quadro
+        ({quadro: silhueta}). Usada no flash do MonsterSprite e no brilho da evolução:
+        o efeito só troca a imagem pela silhueta pronta, sem criar máscaras a cada quadro.
+        frames: Os quadros que quem chama já tem (ex: os do sprite). As chaves do dicionário
+        são esses mesmos quadros, mesmo que a entrada deles no cache tenha sido descartada e relida.
+        """
+        kind = 'silhouettes mirrored' if mirrored else 'silhouettes'
+        frames = frames or self.frames(name, mirrored)
+
+        # Se as silhuetas guardadas foram feitas de outros quadros (descartados e relidos),
+        # as chaves delas não servem para estes: refaz a partir dos quadros recebidos
+        if (kind, name) in self.entries and frames['idle'][0] not in self.entries[(kind, name)][0]:
+            self.discard((kind, name))
+
+        def load():
+            silhouettes = {}
+            for state_frames in frames.values():
+                for frame in state_frames:
+                    surf = pygame.mask.from_surface(frame).to_surface()
+                    surf.set_colorkey('black') # Remove o fundo preto da máscara
+                    silhouettes[frame] = surf
+            return silhouettes, self.get_size(silhouettes.values())
+        return self.get(kind, name, load)
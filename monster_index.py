@@ -8,15 +8,14 @@ class MonsterIndex:
     Exibe uma lista rolável à esquerda e detalhes completos à direita.
     Permite trocar a ordem dos monstros.
     """
-    def __init__(self, monsters, fonts, monster_frames):
+    def __init__(self, monsters, fonts, monster_frames, monster_assets):
         self.display_surface = pygame.display.get_surface()
         self.fonts = fonts
         self.monsters = monsters # Dicionário com a equipe atual do jogador
         self.frame_index = 0 # Para animar o sprite do monstro na tela de detalhes
 
         # Recursos gráficos (Dicionários carregados no main.py)
-        self.icon_frames = monster_frames['monsters']
-        self.monster_frames = monster_frames['monsters']
+        self.monster_assets = monster_assets # Animações e ícones dos monstros (sob demanda)
         self.ui_frames = monster_frames['ui'] # Ícones de ataque, defesa, etc.
 
         # Superfície escura para o fundo (efeito de "dimming" sobre o jogo)
@@ -107,10 +106,8 @@ class MonsterIndex:
             text_surf = self.fonts['regular'].render(monster.name, False, text_color)
             text_rect = text_surf.get_frect(midleft = item_rect.midleft + vector(90, 0))
 
-            # Recupera o ícone do monstro (Navegando na estrutura do dicionário de assets)
-            frames_dict = self.icon_frames[monster.name] 
-            frames_list = list(frames_dict.values())[0] # Pega a lista de animações
-            icon_surf = frames_list[0] # Pega o primeiro frame (estático)
+            # Recupera o ícone do monstro (primeiro frame estático da animação 'idle')
+            icon_surf = self.monster_assets.icon(monster.name)
             icon_rect = icon_surf.get_frect(center = item_rect.midleft + vector(45,0))
 
             # Lógica de Clipping (Só desenha se estiver dentro da área principal)
@@ -157,7 +154,8 @@ class MonsterIndex:
 
         # Animação do Sprite Grande
         self.frame_index += ANIMATION_SPEED * dt
-        monster_surf = self.monster_frames[monster.name]['idle'][int(self.frame_index) % len(self.monster_frames[monster.name]['idle'])]
+        idle_frames = self.monster_assets.frames(monster.name)['idle']
+        monster_surf = idle_frames[int(self.frame_index) % len(idle_frames)]
         monster_rect = monster_surf.get_frect(center = top_rect.center)
         self.display_surface.blit(monster_surf, monster_rect)
 
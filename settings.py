@@ -14,6 +14,62 @@ TILE_SIZE = 64
 # Quanto maior o número, mais quadros de animação são pulados ou mais rápido eles trocam.
 ANIMATION_SPEED = 6
 
+# Tamanho (em tiles) de cada bloco de terreno pré-renderizado.
+# O chão estático é desenhado em blocos de 8x8 tiles em vez de um sprite por tile.
+TERRAIN_CHUNK_SIZE = 8
+
+# Quantos blocos de terreno ficam renderizados na memória ao mesmo tempo.
+# Blocos fora da tela há mais tempo são descartados e refeitos quando voltarem a aparecer.
+TERRAIN_CHUNK_CACHE = 32
+
+# Tamanho (em pixels) das células do mapa de ocupação usado na linha de visão dos NPCs.
+# Metade de um tile: fino o bastante para não bloquear a visão por causa de um canto de árvore.
+LOS_CELL_SIZE = 32
+
+# Quantos mapas (.tmx) ficam carregados na memória ao mesmo tempo.
+# Os mapas são lidos sob demanda; ao passar do limite, o usado há mais tempo é descartado.
+MAP_CACHE_SIZE = 2
+
+# Quantos mapas já construídos (sprites, NPCs e índices) ficam guardados.
+# Voltar para um mapa guardado (ex: sair de uma casa) não reconstrói nada e mantém os NPCs onde estavam.
+SCENE_CACHE_SIZE = 4
+
+# --- STREAMING DE MAPAS GRANDES ---
+# Mapas com pelo menos esta área (em tiles) são construídos por blocos, só perto do jogador.
+# Mapas menores (casas, ginásios) continuam sendo construídos inteiros de uma vez.
+STREAM_MAP_AREA = 48 * 48
+# Tamanho (em tiles) de cada bloco do streaming.
+STREAM_CHUNK_SIZE = 8
+# Blocos a até esta distância (em blocos) do bloco do jogador são construídos...
+STREAM_LOAD_RADIUS = 2
+# ...e só são descartados depois de ficarem mais longe que esta. A folga (histerese) evita
+# construir e destruir o mesmo bloco repetidamente quando o jogador anda perto da borda.
+STREAM_UNLOAD_RADIUS = 3
+
+# Pasta dos mapas compilados (formato binário .pkmap gerado por 'python map_bundle.py').
+# Se o pacote de um mapa estiver desatualizado em relação ao .tmx, o jogo lê o .tmx.
+MAP_BUNDLE_FOLDER = 'data/compiled'
+
+# Quantas threads decodificam imagens e sons ao mesmo tempo durante o carregamento.
+ASSET_LOADER_THREADS = 4
+# Imprime no terminal uma tabela com o tempo de carregamento de cada categoria de assets.
+SHOW_LOAD_TIMES = False
+
+# Cache em disco das folhas (spritesheets) já recortadas, em pixels crus no formato da tela.
+# Da segunda execução em diante, personagens, costa, monstros e ataques não são decodificados.
+USE_SURFACE_CACHE = True
+SURFACE_CACHE_FOLDER = 'data/cache'
+
+# Orçamento (em bytes de pixels) para os gráficos de monstros na memória.
+# Cada espécie é lida na primeira vez que aparece; passando do limite, as usadas há mais tempo saem.
+MONSTER_ASSET_BUDGET = 96 * 1024 * 1024
+
+# Músicas longas tocadas em streaming (pygame.mixer.music) em vez de decodificadas na memória.
+# Os demais arquivos da pasta 'audio' são efeitos curtos, carregados inteiros.
+MUSIC_TRACKS = ('overworld', 'battle', 'evolution')
+# Duração (em segundos) de cada metade da transição entre músicas (sair e entrar).
+MUSIC_FADE_TIME = 0.5
+
 # Espessura da linha branca que aparece ao selecionar um monstro ou opção na batalha.
 BATTLE_OUTLINE_WIDTH = 4
 
@@ -0,0 +1,211 @@
+from settings import *
+from bisect import bisect_left, bisect_right
+from math import ceil, floor
+
+# ==============================================================================
+# ÍNDICES ESPACIAIS
+# ==============================================================================
+
+class SpatialGrid:
+    """
+    Grade uniforme que indexa sprites pelas células (tiles) que o retângulo deles toca.
+    Permite perguntar "quem está nesta área?" (câmera, hitbox) olhando apenas
+    as células envolvidas, em vez de percorrer o grupo inteiro.
+    """
+    def __init__(self, cell_size = TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (coluna, linha) -> set de sprites naquela célula
+        self.sprite_cells = {} # sprite -> células que ele ocupa (para remover/mover rápido)
+
+    def get_cells(self, rect):
+        """
+        Retorna as coordenadas (coluna, linha) de todas as células que o retângulo toca.
+        """
+        left = int(rect.left // self.cell_size)
+        top = int(rect.top // self.cell_size)
+        # ceil - 1 evita que um retângulo encostado na borda "vaze" para a célula vizinha,
+        # sem perder a última célula quando a borda é fracionária (FRect).
+        # max() protege retângulos de largura/altura zero.
+        right = max(left, ceil(rect.right / self.cell_size) - 1)
+        bottom = max(top, ceil(rect.bottom / self.cell_size) - 1)
+        return [(col, row) for col in range(left, right + 1) for row in range(top, bottom + 1)]
+
+    def insert(self, sprite, rect):
+        cells = self.get_cells(rect)
+        self.sprite_cells[sprite] = cells
+        for cell in cells:
+            if cell in self.cells:
+                self.cells[cell].add(sprite)
+            else:
+                self.cells[cell] = {sprite}
+
+    def remove(self, sprite):
+        for cell in self.sprite_cells.pop(sprite, ()):
+            self.cells[cell].discard(sprite)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def query(self, rect):
+        """
+        Retorna o conjunto de sprites registrados nas células que o retângulo toca.
+        É uma fase "larga": quem precisar de precisão ainda testa colisão com o resultado.
+        """
+        found = set()
+        for cell in self.get_cells(rect):
+            if cell in self.cells:
+                found.update(self.cells[cell])
+        return found
+
+    def clear(self):
+        self.cells.clear()
+        self.sprite_cells.clear()
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_cells
+
+    def __len__(self):
+        return len(self.sprite_cells)
+
+class YSortIndex:
+    """
+    Lista persistente dos sprites da camada principal, sempre ordenada por y_sort.
+    Objetos estáticos são inseridos uma única vez (busca binária); só as entidades
+    que se movem são reposicionadas, e apenas quando o y_sort delas muda.
+    Assim a ordenação não precisa ser refeita do zero a cada quadro. Cada reposição é
+    uma busca binária mais o deslocamento da lista (list.insert/del, O(n), mas feito
+    com memmove: bem mais barato que reordenar tudo para os tamanhos de mapa do jogo).
+    """
+    def __init__(self):
+        self.keys = [] # (y_sort, ordem de inserção) em ordem crescente
+        self.sprites = [] # Sprites na mesma posição das chaves
+        self.sprite_keys = {} # sprite -> chave atual
+        self.dynamic_sprites = set() # Entidades (podem mudar de y_sort)
+        # Maior distância entre o y_sort e as bordas do rect. Define a faixa de busca:
+        # um sprite só pode aparecer na tela se o y_sort estiver até essa distância dela.
+        self.static_reach = 0
+        self.dynamic_reach = 0
+
+    def get_reach(self, sprite):
+        return max(sprite.y_sort - sprite.rect.top, sprite.rect.bottom - sprite.y_sort)
+
+    def place(self, sprite, key):
+        index = bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.sprites.insert(index, sprite)
+        self.sprite_keys[sprite] = key
+
+    def unplace(self, sprite):
+        index = bisect_left(self.keys, self.sprite_keys[sprite])
+        del self.keys[index]
+        del self.sprites[index]
+
+    def insert(self, sprite, order, dynamic = False):
+        self.place(sprite, (sprite.y_sort, order))
+        if dynamic:
+            self.dynamic_sprites.add(sprite)
+        else:
+            self.static_reach = max(self.static_reach, self.get_reach(sprite))
+
+    def remove(self, sprite):
+        self.unplace(sprite)
+        del self.sprite_keys[sprite]
+        self.dynamic_sprites.discard(sprite)
+
+    def reposition(self):
+        """
+        Atualiza a posição das entidades cujo y_sort mudou desde o último quadro.
+        Custo: busca binária mais deslocamentos O(n) da lista por entidade que se moveu.
+        """
+        self.dynamic_reach = 0
+        for sprite in self.dynamic_sprites:
+            key = self.sprite_keys[sprite]
+            if key[0] != sprite.y_sort:
+                self.unplace(sprite)
+                self.place(sprite, (sprite.y_sort, key[1]))
+            self.dynamic_reach = max(self.dynamic_reach, self.get_reach(sprite))
+
+    def query(self, rect):
+        """
+        Retorna, já na ordem de desenho, os sprites que tocam o retângulo.
+        Só a faixa de y_sort que pode aparecer na tela é percorrida.
+        """
+        reach = max(self.static_reach, self.dynamic_reach)
+        start = bisect_left(self.keys, (rect.top - reach,))
+        end = bisect_right(self.keys, (rect.bottom + reach, float('inf')))
+        return [sprite for sprite in self.sprites[start:end] if sprite.rect.colliderect(rect)]
+
+    def clear(self):
+        self.keys.clear()
+        self.sprites.clear()
+        self.sprite_keys.clear()
+        self.dynamic_sprites.clear()
+        self.static_reach = self.dynamic_reach = 0
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_keys
+
+class OccupancyGrid:
+    """
+    Mapa de ocupação do mapa inteiro: um byte por célula, 1 = bloqueado.
+    Montado uma vez por mapa a partir das camadas Collisions e Objects e
+    compartilhado por todos os NPCs (em vez de cada um copiar a lista de obstáculos).
+    """
+    def __init__(self, width, height, rects, cell_size = LOS_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = ceil(width / cell_size)
+        self.rows = ceil(height / cell_size)
+        self.cells = bytearray(self.cols * self.rows)
+        for rect in rects:
+            self.mark(rect)
+
+    def mark(self, rect):
+        """
+        Marca como bloqueadas todas as células que o retângulo toca.
+        """
+        left = max(0, int(rect.left // self.cell_size))
+        top = max(0, int(rect.top // self.cell_size))
+        right = min(self.cols - 1, ceil(rect.right / self.cell_size) - 1)
+        bottom = min(self.rows - 1, ceil(rect.bottom / self.cell_size) - 1)
+        for row in range(top, bottom + 1):
+            start = row * self.cols
+            self.cells[start + left:start + right + 1] = b'\x01' * max(0, right - left + 1)
+
+    def is_blocked(self, col, row):
+        # Fora do mapa conta como bloqueado
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return True
+        return self.cells[row * self.cols + col] == 1
+
+    def line_of_sight(self, start, end):
+        """
+        Percorre as células atravessadas pelo segmento start -> end (DDA de Amanatides & Woo)
+        e retorna False se alguma estiver bloqueada.
+        As células de origem e destino são ignoradas: é onde os próprios personagens estão.
+        """
+        x0, y0 = start[0] / self.cell_size, start[1] / self.cell_size
+        x1, y1 = end[0] / self.cell_size, end[1] / self.cell_size
+        col, row = floor(x0), floor(y0)
+        end_col, end_row = floor(x1), floor(y1)
+        dx, dy = x1 - x0, y1 - y0
+
+        # Distância (em fração do segmento) entre duas bordas de célula em cada eixo,
+        # e até a primeira borda a partir do ponto inicial
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        delta_x = abs(1 / dx) if dx else float('inf')
+        delta_y = abs(1 / dy) if dy else float('inf')
+        next_x = ((col + 1 - x0) if dx > 0 else (x0 - col)) * delta_x if dx else float('inf')
+        next_y = ((row + 1 - y0) if dy > 0 else (y0 - row)) * delta_y if dy else float('inf')
+
+        for _ in range(abs(end_col - col) + abs(end_row - row)):
+            if next_x < next_y:
+                col += step_x
+                next_x += delta_x
+            else:
+                row += step_y
+                next_y += delta_y
+            if (col, row) == (end_col, end_row):
+                break
+            if self.is_blocked(col, row):
+                return False
+        return True
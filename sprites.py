@@ -82,6 +82,42 @@ class AnimatedSprite(Sprite):
     def update(self, dt):
         self.animate(dt)
 
+class AnimationClock:
+    """
+    Relógio de animação compartilhado.
+    Todos os tiles de água e costa mostram o mesmo quadro ao mesmo tempo, então
+    o índice avança uma única vez por quadro aqui, em vez de uma vez por tile.
+    """
+    def __init__(self, speed = ANIMATION_SPEED):
+        self.speed = speed
+        self.frame_index = 0
+
+    def frame(self, frames):
+        # Mesmo loop infinito do AnimatedSprite (resto da divisão), para qualquer sequência de quadros
+        return frames[int(self.frame_index) % len(frames)]
+
+    def update(self, dt):
+        self.frame_index += self.speed * dt
+
+class ClockedSprite(Sprite):
+    """
+    Tile animado (água, costa) que não avança a própria animação:
+    a imagem é lida do AnimationClock no momento do desenho.
+    Não precisa de update(), então o custo não cresce com a área de água do mapa.
+    """
+    def __init__(self, pos, frames, groups, clock, z = WORLD_LAYERS['main']):
+        self.frames, self.clock = frames, clock
+        super().__init__(pos, frames[0], groups, z)
+
+    @property
+    def image(self):
+        return self.clock.frame(self.frames)
+
+    @image.setter
+    def image(self, surf):
+        # A imagem sempre vem do relógio; a atribuição feita pelo Sprite base é ignorada
+        pass
+
 # ==============================================================================
 # SPRITES DE BATALHA
 # ==============================================================================
@@ -91,7 +127,7 @@ class MonsterSprite(pygame.sprite.Sprite):
     O sprite principal do monstro na batalha.
     Controla animação, flash de dano e comunicação com a lógica de combate.
     """
-    def __init__(self, pos, frames, groups, monster, index, pos_index, entity, apply_attack, create_monster):
+    def __init__(self, pos, frames, groups, monster, index, pos_index, entity, apply_attack, create_monster, silhouettes):
         # Dados de Identificação
         self.index = index # Índice na equipe (0, 1, 2)
         self.pos_index = pos_index # Posição na tela ('top', 'center', 'bottom')
@@ -106,6 +142,7 @@ class MonsterSprite(pygame.sprite.Sprite):
         
         # Efeitos e Lógica de Ataque
         self.highlight = False # Controla o flash branco
+        self.silhouettes = silhouettes # {quadro: silhueta branca}, pré-calculadas por espécie
         self.target_sprite = None # Quem eu vou atacar?
         self.current_attack = None # Qual ataque vou usar?
         self.apply_attack = apply_attack # Função callback para causar dano real
@@ -137,10 +174,8 @@ class MonsterSprite(pygame.sprite.Sprite):
 
         # Efeito de Flash Branco (Hit/Seleção)
         if self.highlight:
-            # Cria uma máscara (silhueta) e converte em superfície branca
-            white_surf = pygame.mask.from_surface(self.image).to_surface()
-            white_surf.set_colorkey('black') # Remove o fundo preto da máscara
-            self.image = white_surf # Substitui a imagem colorida pela branca temporariamente
+            # Substitui a imagem colorida pela silhueta branca (já pronta) temporariamente
+            self.image = self.silhouettes[self.image]
 
     def set_highlight(self, value):
         self.highlight = value
@@ -153,7 +188,6 @@ class MonsterSprite(pygame.sprite.Sprite):
         self.frame_index = 0
         self.target_sprite = target_sprite
         self.current_attack = attack
-        self.monster.reduce_energy(attack) # Gasta energia imediatamente
 
     def delayed_kill(self, new_monster):
         """ Inicia o timer de morte. new_monster é quem vai substituir este (se houver). """
@@ -171,7 +205,6 @@ class MonsterSprite(pygame.sprite.Sprite):
         for timer in self.timers.values():
             timer.update()
         self.animate(dt)
-        self.monster.update(dt) # Atualiza a lógica do monstro (iniciativa, etc)
 
 class MonsterOutlineSprite(pygame.sprite.Sprite):
     """
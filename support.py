@@ -1,7 +1,44 @@
 from settings import *
 from os.path import join
 from os import walk # Função vital para navegar pelas pastas do sistema operacional
-from pytmx.util_pygame import load_pygame # Biblioteca externa para ler mapas do Tiled (.tmx)
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from surface_cache import get_cache_path, load_frames, save_frames
+
+# ==============================================================================
+# DECODIFICAÇÃO PARALELA
+# ==============================================================================
+# Descompactar PNG e decodificar áudio acontece em C e libera o GIL, então vários
+# arquivos podem ser lidos ao mesmo tempo em threads. Só a conversão para o formato
+# da tela (convert_alpha) fica na thread principal, junto com o display.
+asset_pool = ThreadPoolExecutor(max_workers = ASSET_LOADER_THREADS)
+
+def load_images(paths):
+    """
+    Lê várias imagens em paralelo e converte na thread principal.
+    Retorna as superfícies na mesma ordem dos caminhos.
+    """
+    return [surf.convert_alpha() for surf in asset_pool.map(pygame.image.load, paths)]
+
+class LoadTimer:
+    """
+    Mede quanto tempo cada categoria de assets leva no carregamento e imprime uma tabela.
+    """
+    def __init__(self):
+        self.times = {}
+        self.last = perf_counter()
+
+    def lap(self, category):
+        # Tempo desde a categoria anterior (ou desde a criação do timer)
+        now = perf_counter()
+        self.times[category] = now - self.last
+        self.last = now
+
+    def report(self):
+        print(f'{"categoria":<16}{"ms":>9}')
+        for category, seconds in self.times.items():
+            print(f'{category:<16}{seconds * 1000:>9.1f}')
+        print(f'{"total":<16}{sum(self.times.values()) * 1000:>9.1f}')
 
 # ==============================================================================
 # IMPORTAÇÃO DE IMAGENS E ARQUIVOS
@@ -28,17 +65,15 @@ def simple_icon_importer(folder_path):
     
     # Navega pela pasta
     for folder_name, sub_folders, file_names in walk(folder_path):
-        for file_name in file_names:
-            if file_name.endswith(('.png', '.jpg', '.jpeg')):
-                full_path = join(folder_name, file_name)
-                
-                # Carrega a imagem
-                surf = pygame.image.load(full_path).convert_alpha()
-                
-                # Cria a chave do dicionário (nome do arquivo sem extensão, em minúsculo)
-                key_name = file_name.split('.')[0].lower()
-                
-                icon_frames[key_name] = surf
+        file_names = [file_name for file_name in file_names if file_name.endswith(('.png', '.jpg', '.jpeg'))]
+        
+        # Carrega as imagens (em paralelo)
+        surfs = load_images([join(folder_name, file_name) for file_name in file_names])
+        
+        for file_name, surf in zip(file_names, surfs):
+            # Cria a chave do dicionário (nome do arquivo sem extensão, em minúsculo)
+            key_name = file_name.split('.')[0].lower()
+            icon_frames[key_name] = surf
                 
     return icon_frames
 
@@ -50,10 +85,8 @@ def import_folder(*path):
     frames = []
     for folder_path, sub_folders, image_names in walk(join(*path)):
         # 'sorted' garante que a animação toque na ordem certa (0, 1, 2...) e não aleatória
-        for image_name in sorted(image_names, key = lambda name: int(name.split('.')[0])):
-            full_path = join(folder_path, image_name)
-            surf = pygame.image.load(full_path).convert_alpha()
-            frames.append(surf)
+        image_names = sorted(image_names, key = lambda name: int(name.split('.')[0]))
+        frames.extend(load_images([join(folder_path, image_name) for image_name in image_names]))
     return frames
 
 def import_folder_dict(*path):
@@ -63,9 +96,8 @@ def import_folder_dict(*path):
     """
     frames = {}
     for folder_path, sub_folders, image_names in walk(join(*path)):
-        for image_name in image_names:
-            full_path = join(folder_path, image_name)
-            surf = pygame.image.load(full_path).convert_alpha()
+        surfs = load_images([join(folder_path, image_name) for image_name in image_names])
+        for image_name, surf in zip(image_names, surfs):
             frames[image_name.split('.')[0]] = surf
     return frames
 
@@ -85,14 +117,21 @@ def import_sub_folders(*path):
 # MANIPULAÇÃO DE SPRITESHEETS (RECORTES)
 # ==============================================================================
 
-def import_tilemap(cols, rows, *path):
+def import_tilemap(cols, rows, *path, subsurface = True, compact = False, surf = None):
     """
     Corta uma imagem grande (SpriteSheet) em vários pedaços menores (Grid).
     cols: Quantas colunas tem a imagem.
     rows: Quantas linhas tem a imagem.
+    subsurface: Se True, cada pedaço é uma "janela" (subsurface) da folha com transparência
+                por pixel: nada é copiado e todos os quadros compartilham a mesma memória.
+                Se False, usa o método antigo (cópia em superfície nova com colorkey verde).
+    compact: Só com subsurface. Copia cada janela para uma superfície própria (ainda com alpha),
+             permitindo que a folha inteira seja liberada se só alguns quadros forem guardados.
+    surf: Folha já carregada (ex: lida em paralelo com load_images). Se None, lê de *path.
     """
     frames = {}
-    surf = import_image(*path) # Carrega a imagem completa
+    if surf is None:
+        surf = import_image(*path) # Carrega a imagem completa (já convertida com convert_alpha)
     
     # Calcula o tamanho de cada célula individual
     cell_width, cell_height = surf.get_width() / cols, surf.get_height() / rows
@@ -101,6 +140,11 @@ def import_tilemap(cols, rows, *path):
         for row in range(rows):
             # Define o retângulo da área que queremos cortar
             cutout_rect = pygame.Rect(col * cell_width, row * cell_height, cell_width, cell_height)
+
+            if subsurface:
+                cutout_surf = surf.subsurface(cutout_rect)
+                frames[(col, row)] = cutout_surf.copy() if compact else cutout_surf
+                continue
             
             # Cria uma superfície nova vazia
             cutout_surf = pygame.Surface((cell_width, cell_height))
@@ -114,13 +158,32 @@ def import_tilemap(cols, rows, *path):
             frames[(col, row)] = cutout_surf
     return frames
 
-def character_importer(cols, rows, *path):
+def import_tilemaps(cols, rows, paths, compact = False):
+    """
+    Recorta várias folhas do mesmo formato de grade (cols x rows) de uma vez.
+    Com USE_SURFACE_CACHE, folhas já recortadas antes vêm do cache em disco (sem decodificar);
+    só as que faltam são lidas (em paralelo), recortadas e salvas no cache.
+    Retorna uma lista de dicionários {(coluna, linha): quadro}, na ordem dos caminhos.
+    """
+    cache_paths = [get_cache_path(path, cols, rows) if USE_SURFACE_CACHE else None for path in paths]
+    frame_dicts = [load_frames(cache_path) if cache_path else None for cache_path in cache_paths]
+
+    missing = [index for index, frame_dict in enumerate(frame_dicts) if frame_dict is None]
+    sheets = load_images([paths[index] for index in missing])
+    for index, sheet in zip(missing, sheets):
+        frame_dicts[index] = import_tilemap(cols, rows, compact = compact, surf = sheet)
+        if cache_paths[index]:
+            save_frames(cache_paths[index], frame_dicts[index], cols, rows)
+    return frame_dicts
+
+def character_importer(cols, rows, *path, frame_dict = None):
     """
     Usa o import_tilemap para organizar sprites de personagens.
     Assume o padrão clássico de RPG Maker:
     Linha 0: Baixo, Linha 1: Esquerda, Linha 2: Direita, Linha 3: Cima.
     """
-    frame_dict = import_tilemap(cols, rows, *path)
+    if frame_dict is None:
+        frame_dict = import_tilemap(cols, rows, *path)
     new_dict = {}
     for row, direction in enumerate(('down', 'left', 'right', 'up')):
         # Pega todas as colunas daquela linha para criar a animação de andar
@@ -134,11 +197,13 @@ def all_character_import(*path):
     Wrapper para importar todos os personagens de uma pasta de uma vez.
     """
     new_dict = {}
-    for _, __, image_names in walk(join(*path)):
-        for image in image_names:
+    for folder_path, __, image_names in walk(join(*path)):
+        # Recorta todas as folhas da pasta de uma vez (cache em disco ou leitura em paralelo)
+        frame_dicts = import_tilemaps(4, 4, [join(folder_path, image) for image in image_names])
+        for image, frame_dict in zip(image_names, frame_dicts):
             image_name = image.split('.')[0]
             # Chama a função acima para cada arquivo encontrado
-            new_dict[image_name] = character_importer(4,4,*path, image_name)
+            new_dict[image_name] = character_importer(4,4,*path, image_name, frame_dict = frame_dict)
     return new_dict
 
 def coast_importer(cols, rows, *path):
@@ -147,7 +212,7 @@ def coast_importer(cols, rows, *path):
     Organiza os tiles baseado em sua posição (canto superior, borda esquerda, etc)
     para criar o autotiling.
     """
-    frame_dict = import_tilemap(cols, rows, *path)
+    frame_dict = import_tilemaps(cols, rows, [join(*path) + '.png'])[0]
     new_dict = {}
     terrains = ['grass', 'grass_i', 'sand_i', 'sand', 'rock', 'rock_i', 'ice', 'ice_i']
     sides = {
@@ -162,16 +227,6 @@ def coast_importer(cols, rows, *path):
             new_dict[terrain][key] = [frame_dict[(pos[0] + index * 3, pos[1] + row)] for row in range(0,rows, 3)]
     return new_dict
 
-def tmx_importer(*path):
-    """
-    Carrega arquivos de mapa do Tiled (.tmx).
-    """
-    tmx_dict = {}
-    for folder_path, sub_folders, file_names in walk(join(*path)):
-        for file in file_names:
-            tmx_dict[file.split('.')[0]] = load_pygame(join(folder_path, file))
-    return tmx_dict
-
 def monster_importer(cols, rows, *path):
     """
     Importador específico para monstros de batalha.
@@ -179,10 +234,12 @@ def monster_importer(cols, rows, *path):
     """
     monster_dict = {}
     for folder_path, sub_folders, image_names in walk(join(*path)):
-        for image in image_names:
+        # Quadros grandes desenhados a cada quadro da batalha: cópias compactas com alpha
+        # são mais rápidas de desenhar que janelas (subsurface) da folha inteira
+        frame_dicts = import_tilemaps(cols, rows, [join(folder_path, image) for image in image_names], compact = True)
+        for image, frame_dict in zip(image_names, frame_dicts):
             image_name = image.split('.')[0]
             monster_dict[image_name] = {}
-            frame_dict = import_tilemap(cols, rows, *path, image_name)
             for row, key in enumerate(('idle', 'attack')):
                 monster_dict[image_name][key] = [frame_dict[(col,row)] for col in range(cols)]
     return monster_dict
@@ -190,34 +247,27 @@ def monster_importer(cols, rows, *path):
 def outline_creator(frame_dict, width):
     """
     Cria um contorno branco ao redor dos sprites.
-    Técnica: Pega a silhueta (máscara) do sprite e a desenha 8 vezes deslocada
-    ao redor do centro, criando uma borda grossa.
-    """
+    Técnica: a silhueta (máscara) do sprite é "engordada" de uma vez com uma convolução
+    contra um núcleo com 8 pontos (cantos, lados, cima e baixo, a 'width' pixels do centro).
+    O resultado é o mesmo de desenhar a silhueta 8 vezes deslocada, sem os 8 blits por quadro.
+    """
+    # Núcleo (2w+1 x 2w+1) com os mesmos 8 deslocamentos; o centro fica de fora, como antes
+    kernel = pygame.mask.Mask((width * 2 + 1, width * 2 + 1))
+    for x in (0, width, width * 2):
+        for y in (0, width, width * 2):
+            if (x, y) != (width, width):
+                kernel.set_at((x, y))
+
     outline_frame_dict = {}
     for monster, monster_frames in frame_dict.items():
         outline_frame_dict[monster] = {}
         for state, frames in monster_frames.items():
             outline_frame_dict[monster][state] = []
             for frame in frames:
-                # Cria uma superfície maior para caber o contorno
-                new_surf = pygame.Surface(vector(frame.get_size()) + vector(width * 2), pygame.SRCALPHA)
-                new_surf.fill((0,0,0,0))
-                
-                # Cria a máscara branca
-                white_frame = pygame.mask.from_surface(frame).to_surface()
-                white_frame.set_colorkey('black')
-
-                # Desenha a máscara branca em todas as direções (Cima, Baixo, Diagonais, Lados)
-                new_surf.blit(white_frame, (0,0))
-                new_surf.blit(white_frame, (width,0))
-                new_surf.blit(white_frame, (width * 2,0))
-                new_surf.blit(white_frame, (width * 2,width))
-                new_surf.blit(white_frame, (width * 2,width * 2))
-                new_surf.blit(white_frame, (width,width * 2))
-                new_surf.blit(white_frame, (0,width * 2))
-                new_surf.blit(white_frame, (0,width))
-                
+                # A convolução já devolve a máscara do tamanho do quadro + a borda dos dois lados
+                outline_mask = pygame.mask.from_surface(frame).convolve(kernel)
                 # O resultado final é uma imagem "gorda" e branca que servirá de fundo
+                new_surf = outline_mask.to_surface(setcolor = 'white', unsetcolor = (0,0,0,0))
                 outline_frame_dict[monster][state].append(new_surf)
     return outline_frame_dict
 
@@ -227,10 +277,11 @@ def attack_importer(*path):
     """
     attack_dict = {}
     for folder_path, _, image_names in walk(join(*path)):
-        for image in image_names:
+        frame_dicts = import_tilemaps(4, 1, [join(folder_path, image) for image in image_names])
+        for image, frame_dict in zip(image_names, frame_dicts):
             image_name = image.split('.')[0]
             # Assume 4 frames por animação em 1 linha
-            attack_dict[image_name] = list(import_tilemap(4,1,folder_path, image_name).values())
+            attack_dict[image_name] = list(frame_dict.values())
     return attack_dict
 
 def audio_importer(*path):
@@ -239,9 +290,10 @@ def audio_importer(*path):
     """
     files = {}
     for folder_path, _, file_names in walk(join(*path)):
-        for file_name in file_names:
-            full_path = join(folder_path, file_name)
-            files[file_name.split('.')[0]] = pygame.mixer.Sound(full_path)
+        # Decodifica os arquivos (ogg, mp3, wav) em paralelo
+        sounds = asset_pool.map(pygame.mixer.Sound, [join(folder_path, file_name) for file_name in file_names])
+        for file_name, sound in zip(file_names, sounds):
+            files[file_name.split('.')[0]] = sound
     return files
 
 # ==============================================================================
@@ -0,0 +1,81 @@
+from settings import *
+from os.path import join, exists, basename, splitext, dirname, getsize
+from os import makedirs, remove, replace
+from glob import glob
+from hashlib import sha1
+import mmap
+import struct
+
+# ==============================================================================
+# CACHE EM DISCO DAS FOLHAS JÁ RECORTADAS
+# ==============================================================================
+# Decodificar o PNG e recortar a folha (spritesheet) dá sempre o mesmo resultado
+# enquanto o arquivo não muda. Na primeira execução, os quadros recortados são salvos
+# como pixels crus no formato da tela (BGRA, o mesmo do convert_alpha); nas seguintes,
+# o arquivo é aberto com mmap e cada quadro vira uma superfície direto sobre esses bytes
+# (pygame.image.frombuffer), sem decodificar nem recortar nada.
+#
+#   [cabeçalho] MAGIC + colunas + linhas + largura e altura do quadro
+#   [pixels]    os quadros, um depois do outro, na ordem (coluna, linha) do recorte
+#
+# A chave é o hash do conteúdo do PNG junto com os parâmetros do recorte.
+
+MAGIC = b'PKSF'
+VERSION = 1
+PIXEL_FORMAT = 'BGRA'
+HEADER = struct.Struct('<4sHHHII') # magic, versão, colunas, linhas, largura, altura
+
+def get_cache_path(path, cols, rows, tag = '', folder = SURFACE_CACHE_FOLDER):
+    """
+    tag: Distingue quadros derivados da mesma folha (ex: 'outline4' para os contornos).
+    """
+    with open(path, 'rb') as file:
+        digest = sha1(file.read())
+    digest.update(f'{cols}x{rows}:{tag}:{PIXEL_FORMAT}:{VERSION}'.encode())
+    # Pasta e nome da folha no arquivo permitem apagar versões antigas dela ao salvar uma nova
+    name = f'{basename(dirname(path))}_{splitext(basename(path))[0]}' + (f'_{tag}' if tag else '')
+    return join(folder, f'{name}-{cols}x{rows}-{digest.hexdigest()}.bin')
+
+def load_frames(cache_path):
+    """
+    Retorna {(coluna, linha): superfície} lido do cache, ou None se não houver
+    (ou se o arquivo estiver corrompido: aí o PNG é decodificado de novo).
+    As superfícies apontam para o arquivo mapeado: as páginas só são lidas quando usadas.
+    """
+    if not exists(cache_path) or getsize(cache_path) < HEADER.size:
+        return None
+    with open(cache_path, 'rb') as file:
+        magic, version, cols, rows, width, height = HEADER.unpack(file.read(HEADER.size))
+        # Tamanho exato: cabeçalho + todos os quadros (um arquivo cortado não passa)
+        if magic != MAGIC or version != VERSION or getsize(cache_path) != HEADER.size + cols * rows * width * height * 4:
+            return None
+        # ACCESS_COPY: se alguém desenhar sobre um quadro, a alteração fica só na memória
+        buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+
+    view = memoryview(buffer)
+    frame_size = width * height * 4
+    frames = {}
+    start = HEADER.size
+    for col in range(cols):
+        for row in range(rows):
+            frames[(col, row)] = pygame.image.frombuffer(view[start:start + frame_size], (width, height), PIXEL_FORMAT)
+            start += frame_size
+    return frames
+
+def save_frames(cache_path, frames, cols, rows):
+    makedirs(dirname(cache_path), exist_ok = True)
+    # Descarta recortes antigos da mesma folha (o PNG mudou desde então)
+    prefix = cache_path.rsplit('-', 1)[0]
+    for old_path in glob(f'{prefix}-*.bin'):
+        remove(old_path)
+
+    # Escreve num arquivo temporário na mesma pasta e só então troca pelo definitivo:
+    # se o jogo for fechado no meio, não fica um cache pela metade no lugar do certo
+    width, height = frames[(0, 0)].get_size()
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, cols, rows, width, height))
+        for col in range(cols):
+            for row in range(rows):
+                file.write(pygame.image.tobytes(frames[(col, row)], PIXEL_FORMAT))
+    replace(temp_path, cache_path)
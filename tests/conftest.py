@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os testes rodam sem janela e importam os módulos da raiz do projeto (como o main.py)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
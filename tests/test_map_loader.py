@@ -0,0 +1,28 @@
+import threading
+from map_loader import MapCache
+
+def test_queued_prefetch_does_not_block_request():
+    cache = MapCache('data', 'maps')
+    cache.paths = {'a': 'a.tmx', 'b': 'b.tmx'}
+    started, running, release = [], threading.Event(), threading.Event()
+
+    def load(name):
+        if threading.current_thread() is not threading.main_thread():
+            started.append(name)
+            running.set()
+            release.wait(5) # A thread fica presa no primeiro mapa da fila
+        return name
+
+    cache.load = load
+    cache.prefetch(['a', 'b'])
+    running.wait(5)
+    queued = 'b' if started[0] == 'a' else 'a'
+    try:
+        # O mapa ainda na fila é carregado na hora, sem esperar o outro terminar
+        assert cache[queued] == queued
+        assert not release.is_set()
+        assert cache.stats['misses'] == 1
+    finally:
+        release.set()
+        cache.executor.shutdown()
+    assert started == [started[0]]
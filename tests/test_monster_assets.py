@@ -0,0 +1,66 @@
+import pygame
+import pytest
+import monster_assets
+import support
+from monster_assets import MonsterAssets
+from monster import Monster
+from sprites import MonsterSprite
+
+SPECIES = ('embercan', 'capiblu', 'sapling')
+
+@pytest.fixture
+def assets(monkeypatch):
+    # Sem cache em disco: os testes não escrevem em data/cache
+    monkeypatch.setattr(monster_assets, 'USE_SURFACE_CACHE', False)
+    monkeypatch.setattr(support, 'USE_SURFACE_CACHE', False)
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield lambda budget: MonsterAssets('graphics', 'monsters', budget = budget)
+    pygame.display.quit()
+
+def load_sprite_graphics(assets, name, mirrored):
+    # Mesma sequência do Battle.create_monster
+    frames = assets.frames(name, mirrored)
+    assets.outlines(name, mirrored)
+    return frames, assets.silhouettes(name, mirrored, frames)
+
+@pytest.mark.parametrize('budget', [1, 8 * 1024 * 1024])
+def test_silhouettes_match_sprite_frames_under_small_budget(assets, budget):
+    assets = assets(budget)
+    for _ in range(2):
+        for mirrored in (False, True):
+            for name in SPECIES:
+                frames, silhouettes = load_sprite_graphics(assets, name, mirrored)
+                for state_frames in frames.values():
+                    for frame in state_frames:
+                        assert silhouettes[frame].get_size() == frame.get_size()
+
+def test_acquired_graphics_survive_tiny_budget(assets):
+    # Mesma sequência do Battle.setup + create_monster, com um orçamento de 1 byte
+    assets = assets(1)
+    graphics = {(name, mirrored): assets.acquire(name, mirrored) for name in SPECIES for mirrored in (False, True)}
+    group = pygame.sprite.Group()
+    sprites = []
+    for (name, mirrored), (frames, outlines, silhouettes) in graphics.items():
+        monster = Monster(name, 10)
+        sprites.append(MonsterSprite((0, 0), frames, group, monster, 0, 0, 'player' if mirrored else 'opponent', None, None, silhouettes))
+
+    # Outras espécies carregadas durante a batalha (ícones, trocas) não tiram nada dos sprites
+    for name in ('wardensawi', 'araclaw', 'earthshroud'):
+        assets.icon(name)
+        assets.frames(name, True)
+    for name, mirrored in graphics:
+        assert assets.acquire(name, mirrored) == graphics[(name, mirrored)]
+        assets.release(name, mirrored)
+
+    for sprite in sprites:
+        sprite.set_highlight(True)
+        for _ in range(8):
+            sprite.animate(0.1)
+            assert sprite.image in sprite.silhouettes.values()
+
+    # Depois do fim da batalha o orçamento volta a valer
+    for name, mirrored in graphics:
+        assets.release(name, mirrored)
+    assert not assets.pins
+    assert not assets.entries and assets.used == 0
@@ -0,0 +1,30 @@
+import pygame
+from spatial import SpatialGrid, OccupancyGrid
+
+def test_get_cells_fractional_edges():
+    grid = SpatialGrid(64)
+    # Borda direita/inferior em 64.16: ainda toca a segunda célula
+    assert grid.get_cells(pygame.FRect(0.5, 0.5, 63.66, 63.66)) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+def test_get_cells_edge_on_cell_border():
+    grid = SpatialGrid(64)
+    # Encostado na borda não vaza para a célula vizinha
+    assert grid.get_cells(pygame.Rect(0, 0, 64, 64)) == [(0, 0)]
+    assert grid.get_cells(pygame.FRect(0, 0, 64.0, 64.0)) == [(0, 0)]
+    assert grid.get_cells(pygame.FRect(10, 10, 0, 0)) == [(0, 0)]
+
+def test_query_finds_sprite_across_fractional_edge():
+    grid = SpatialGrid(64)
+    wall = object()
+    grid.insert(wall, pygame.Rect(64, 0, 64, 64))
+    hitbox = pygame.FRect(32.5, 10, 31.66, 20) # right = 64.16
+    assert wall in grid.query(hitbox)
+    assert hitbox.colliderect(pygame.Rect(64, 0, 64, 64))
+
+def test_occupancy_mark_fractional_edges():
+    grid = OccupancyGrid(128, 128, [pygame.FRect(0.5, 0.5, 31.66, 31.66)], cell_size = 32)
+    assert grid.is_blocked(1, 1)
+    assert not grid.is_blocked(2, 2)
+    grid = OccupancyGrid(128, 128, [pygame.Rect(0, 0, 32, 32)], cell_size = 32)
+    assert grid.is_blocked(0, 0)
+    assert not grid.is_blocked(1, 0) and not grid.is_blocked(0, 1)
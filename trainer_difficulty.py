@@ -0,0 +1,188 @@
+from game_data import TRAINER_DATA, MONSTER_DATA, ATTACK_DATA
+from monster import Monster
+from battle_core import BattleCore
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+from os.path import join, exists, dirname
+from os import makedirs, cpu_count
+from random import Random
+from math import sqrt
+import argparse
+import json
+
+# ==============================================================================
+# DIFICULDADE DOS TREINADORES (MONTE CARLO)
+# ==============================================================================
+# Estima a chance de o jogador vencer cada treinador do TRAINER_DATA: simula muitas
+# batalhas completas (BattleCore, equipe contra equipe) com níveis sorteados para a
+# equipe do jogador e conta as vitórias. O resultado vem com um intervalo de confiança
+# de Wilson (95%), que continua válido perto de 0% e de 100%.
+#
+# As simulações são divididas em blocos e rodam em vários processos. Cada resultado fica
+# num cache JSON, com uma chave que é o hash dos dados usados por aquele treinador (equipe dele,
+# espécies envolvidas, ataques, regras da batalha e parâmetros). Mudar um treinador ou
+# uma espécie só refaz os treinadores afetados.
+#
+# Uso (na raiz do projeto):
+#   python trainer_difficulty.py [treinadores...] [--party embercan,capiblu,wardensawi] [--levels 14-18]
+
+CACHE_PATH = join('data', 'cache', 'trainer_difficulty.json')
+RULES_FILES = ('battle_core.py', 'monster.py') # Mudou a regra, muda o resultado
+DEFAULT_PARTY = ('embercan', 'capiblu', 'wardensawi') # Equipe inicial do jogador (main.py)
+DEFAULT_LEVELS = (14, 18)
+SIMULATIONS = 2000 # Batalhas por treinador
+CHUNK_SIZE = 250 # Batalhas por tarefa enviada a um processo
+MAX_TURNS = 400 # Batalhas mais longas que isso contam como derrota (empate)
+Z = 1.96 # 95% de confiança
+
+def player_action(core):
+    """
+    Jogada aleatória do jogador: só habilidades que a energia paga (como no menu da batalha).
+    Sem nenhuma, defende. Retorna (habilidade, alvo) ou None.
+    """
+    abilities = core.current.get_abilities(all = False)
+    if not abilities:
+        return None
+    ability = core.rng.choice(abilities)
+    targets = core.get_active('player' if ATTACK_DATA[ability]['target'] == 'player' else 'opponent')
+    if not targets:
+        return None # Todos os alvos desmaiaram e os substitutos ainda não entraram
+    return ability, core.rng.choice(targets)
+
+def run_battle(trainer_monsters, party, levels, rng):
+    """
+    Uma batalha completa. Retorna (venceu, turnos).
+    """
+    player_monsters = {index: Monster(name, rng.randint(*levels)) for index, name in enumerate(party)}
+    opponent_monsters = {index: Monster(name, level) for index, (name, level) in trainer_monsters.items()}
+    core = BattleCore(player_monsters, opponent_monsters, rng)
+
+    turns = 0
+    while not core.winner and turns < MAX_TURNS:
+        monster = core.advance()
+        if not monster:
+            continue
+        turns += 1
+        action = player_action(core) if core.get_side(monster) == 'player' else core.choose_action()
+        if not action:
+            core.defend()
+            continue
+        ability, target = action
+        core.begin_attack(ability)
+        # Sem animação de morte: os substitutos entram na hora
+        for _, new_monster_data in core.apply_attack(target, ability, monster.get_base_damage(ability)):
+            if new_monster_data:
+                core.spawn(*new_monster_data)
+    return core.winner == 'player', turns
+
+def run_chunk(task):
+    # Tarefa de um processo: um bloco de batalhas contra um treinador (semente fixa = reproduzível)
+    trainer, seed, count, party, levels = task
+    rng = Random(seed)
+    trainer_monsters = TRAINER_DATA[trainer]['monsters']
+    wins = total_turns = 0
+    for _ in range(count):
+        won, turns = run_battle(trainer_monsters, party, levels, rng)
+        wins += won
+        total_turns += turns
+    return trainer, wins, total_turns
+
+def wilson_interval(wins, total, z = Z):
+    """
+    Intervalo de confiança de Wilson para uma proporção (wins / total).
+    """
+    if not total:
+        return 0.0, 1.0
+    p = wins / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def get_key(trainer, party, levels, simulations):
+    """
+    Hash dos dados que influenciam o resultado de um treinador.
+    """
+    species = sorted({name for name, _ in TRAINER_DATA[trainer]['monsters'].values()} | set(party))
+    rules = []
+    for path in RULES_FILES:
+        with open(path, 'rb') as file:
+            rules.append(sha1(file.read()).hexdigest())
+    data = {
+        'trainer': {str(k): v for k, v in TRAINER_DATA[trainer]['monsters'].items()},
+        'species': {name: {'stats': MONSTER_DATA[name]['stats'], 'abilities': {str(k): v for k, v in MONSTER_DATA[name]['abilities'].items()}} for name in species},
+        'attacks': ATTACK_DATA,
+        'rules': rules,
+        'params': [list(party), list(levels), simulations, MAX_TURNS],
+    }
+    return sha1(json.dumps(data, sort_keys = True).encode()).hexdigest()
+
+def load_cache(path = CACHE_PATH):
+    if not exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def save_cache(cache, path = CACHE_PATH):
+    makedirs(dirname(path), exist_ok = True)
+    with open(path, 'w') as file:
+        json.dump(cache, file, indent = 1, sort_keys = True)
+
+def estimate(trainers = None, party = DEFAULT_PARTY, levels = DEFAULT_LEVELS, simulations = SIMULATIONS, workers = None, cache_path = CACHE_PATH):
+    """
+    Retorna {treinador: {'wins', 'simulations', 'win_rate', 'low', 'high', 'turns', 'cached'}}.
+    Só os treinadores sem resultado no cache (ou com dados alterados) são simulados.
+    """
+    trainers = [trainer for trainer in (trainers or TRAINER_DATA) if 'monsters' in TRAINER_DATA[trainer]]
+    cache = load_cache(cache_path)
+    keys = {trainer: get_key(trainer, party, levels, simulations) for trainer in trainers}
+    missing = [trainer for trainer in trainers if cache.get(trainer, {}).get('key') != keys[trainer]]
+
+    # Treinadores com a mesma equipe têm a mesma chave: simula só um de cada
+    simulated = {keys[trainer]: trainer for trainer in missing}
+
+    # Blocos de todos os treinadores pendentes na mesma fila, para ocupar todos os processos
+    tasks = []
+    for key, trainer in simulated.items():
+        for start in range(0, simulations, CHUNK_SIZE):
+            seed = int(key[:8], 16) + start
+            tasks.append((trainer, seed, min(CHUNK_SIZE, simulations - start), tuple(party), tuple(levels)))
+
+    totals = {key: [0, 0] for key in simulated}
+    if tasks:
+        with ProcessPoolExecutor(max_workers = workers or cpu_count()) as pool:
+            for trainer, wins, turns in pool.map(run_chunk, tasks):
+                totals[keys[trainer]][0] += wins
+                totals[keys[trainer]][1] += turns
+
+    results = {}
+    for trainer in trainers:
+        if trainer in missing:
+            wins, turns = totals[keys[trainer]]
+            low, high = wilson_interval(wins, simulations)
+            cache[trainer] = {'key': keys[trainer], 'wins': wins, 'simulations': simulations,
+                              'win_rate': wins / simulations, 'low': low, 'high': high, 'turns': turns / simulations}
+        results[trainer] = dict(cache[trainer], cached = trainer not in missing)
+        del results[trainer]['key']
+
+    if missing:
+        save_cache(cache, cache_path)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Chance de vitória do jogador contra cada treinador.')
+    parser.add_argument('trainers', nargs = '*', help = 'IDs do TRAINER_DATA (padrão: todos)')
+    parser.add_argument('--party', default = ','.join(DEFAULT_PARTY), help = 'espécies da equipe do jogador, separadas por vírgula')
+    parser.add_argument('--levels', default = f'{DEFAULT_LEVELS[0]}-{DEFAULT_LEVELS[1]}', help = 'faixa de nível da equipe (ex: 14-18)')
+    parser.add_argument('--simulations', type = int, default = SIMULATIONS)
+    parser.add_argument('--workers', type = int, default = None)
+    args = parser.parse_args()
+
+    party = tuple(name.strip() for name in args.party.split(','))
+    levels = tuple(int(level) for level in args.levels.split('-'))
+    results = estimate(args.trainers, party, levels, args.simulations, args.workers)
+
+    print(f'{"treinador":<10}{"vitória":>9}{"IC 95%":>17}{"turnos":>8}')
+    for trainer, result in results.items():
+        interval = f'{result["low"]:.1%} - {result["high"]:.1%}'
+        print(f'{trainer:<10}{result["win_rate"]:>9.1%}{interval:>17}{result["turns"]:>8.1f}' + ('  (cache)' if result['cached'] else ''))